@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# Living Hinge benchmarks
+# - Runs the hinge engine on synthetic outlines, no Inkscape needed
+# - Writes machine readable results and compares two result files
+#
+#   python benchmark.py run -o before.json
+#   python benchmark.py run -o after.json
+#   python benchmark.py compare before.json after.json
+
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+
+from shapes import SHAPES, get_config, get_shape
+from livinghinge import iter_hinge, iter_path_data, stitch_cells
+
+
+def rectangle(x, y, w, h):
+    return [(x, y), (x + w, y), (x + w, y + h), (x, y + h), (x, y)]
+
+
+def circle(cx, cy, r, n, clockwise=False):
+    step = -2 * math.pi / n if clockwise else 2 * math.pi / n
+    pts = [(cx + r * math.cos(i * step), cy + r * math.sin(i * step)) for i in range(n)]
+    return pts + [pts[0]]
+
+
+def concave(w, h, teeth):
+    # A comb: the bottom edge is solid, the top is cut into teeth.
+    pts = [(0.0, 0.0), (w, 0.0), (w, h)]
+    tooth = w / (2 * teeth)
+    for i in range(teeth):
+        right = w - 2 * i * tooth
+        pts += [(right - tooth, h), (right - tooth, h * 0.4), (right - 2 * tooth, h * 0.4)]
+        if i < teeth - 1:
+            pts.append((right - 2 * tooth, h))
+    pts += [(0.0, h * 0.4), (0.0, 0.0)]
+    return pts
+
+
+def outlines(quick=False):
+    k = 0.4 if quick else 1.0
+    holes = [rectangle(0, 0, 200 * k, 120 * k)]
+    for i in range(4 if quick else 12):
+        for j in range(2 if quick else 5):
+            holes.append(circle((12 + i * 16) * k, (14 + j * 23) * k, 3 * k, 24, clockwise=True))
+    return {
+        "rect": [rectangle(0, 0, 200 * k, 120 * k)],
+        "circle": [circle(100 * k, 100 * k, 90 * k, 64 if quick else 720)],
+        "holes": holes,
+        "concave": [concave(200 * k, 120 * k, 6 if quick else 20)],
+    }
+
+
+# height, width, x_spacing, y_spacing at spacing factor 1, in user units.
+PATTERN_SIZES = {
+    "line": (0.4, 0.0, 1.0, 2.0),
+    "fishbone": (5.0, 5.0, 1.0, -1.0),
+    "cross": (3.0, 6.0, 0.0, 0.0),
+    "bezier": (5.0, 5.0, 1.0, 0.0),
+    "wave": (3.0, 5.0, 0.0, 0.0),
+    "fabric": (10.0, 10.0, 0.0, 0.0),
+    "circle": (5.0, 5.0, 0.0, 1.0),
+}
+
+
+def _bbox(polygons):
+    xs = [p[0] for poly in polygons for p in poly]
+    ys = [p[1] for poly in polygons for p in poly]
+    return (min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys))
+
+
+def cases(quick=False, patterns=None):
+    scales = (1.0,) if quick else (1.0, 0.5)
+    angles = (0.0, 30.0) if quick else (0.0, 30.0, 90.0)
+    for outline, polygons in outlines(quick).items():
+        bbox = _bbox(polygons)
+        for pattern in SHAPES:
+            if patterns and pattern not in patterns:
+                continue
+            height, width, x_spacing, y_spacing = PATTERN_SIZES[pattern]
+            for scale in scales:
+                # The line height is a fraction of the outline, not a size.
+                size = 1.0 if pattern == "line" else scale
+                config = get_config(pattern)(
+                    height * size, width * size, x_spacing * scale, y_spacing * scale, bbox
+                )
+                for angle in angles:
+                    name = f"{outline}/{pattern}/x{scale:g}/{angle:g}deg"
+                    yield name, dict(
+                        polygons=polygons,
+                        shape_fn=get_shape(pattern),
+                        height=config[0],
+                        width=config[1],
+                        x_spacing=config[2],
+                        y_spacing=config[3],
+                        y_offset=config[4],
+                        angle_rad=math.radians(angle),
+                    )
+
+
+def _run_case(kwargs, backend, stitch):
+    start = time.perf_counter()
+    cells = list(iter_hinge(backend=backend, **kwargs))
+    generated = time.perf_counter()
+    stream = stitch_cells(cells) if stitch else cells
+    path_data = list(iter_path_data(stream))
+    emitted = time.perf_counter()
+    return {
+        "generate_s": generated - start,
+        "emit_s": emitted - generated,
+        "cells": len(cells),
+        "segments": sum(len(cell) for cell in cells),
+        "commands": sum(sum(d.count(c) for c in "MLCQ") for d in path_data),
+        "bytes": sum(len(d) for d in path_data),
+    }
+
+
+def run(args):
+    results = {}
+    for name, kwargs in cases(args.quick, args.pattern):
+        kwargs["tolerance"] = args.tolerance
+        best = None
+        for _ in range(args.repeat):
+            sample = _run_case(kwargs, args.backend, args.stitch)
+            if best is None or sample["generate_s"] + sample["emit_s"] < best["generate_s"] + best["emit_s"]:
+                best = sample
+        if args.memory:
+            # Separate pass: tracemalloc slows everything down too much to
+            # share with the timing runs.
+            tracemalloc.start()
+            _run_case(kwargs, args.backend, args.stitch)
+            best["peak_kib"] = tracemalloc.get_traced_memory()[1] / 1024.0
+            tracemalloc.stop()
+        results[name] = best
+        print(
+            f"{name:40s} {best['generate_s'] * 1000:9.1f}ms gen "
+            f"{best['emit_s'] * 1000:8.1f}ms emit {best['segments']:8d} seg",
+            file=sys.stderr,
+        )
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "backend": args.backend,
+        "stitch": args.stitch,
+        "tolerance": args.tolerance,
+        "cases": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=1, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=1, sort_keys=True)
+    return 0
+
+
+def compare(args):
+    with open(args.before, encoding="utf-8") as fh:
+        before = json.load(fh)["cases"]
+    with open(args.after, encoding="utf-8") as fh:
+        after = json.load(fh)["cases"]
+
+    regressions = 0
+    for name in sorted(set(before) & set(after)):
+        old, new = before[name], after[name]
+        notes = []
+        for key in ("generate_s", "emit_s"):
+            if new[key] > old[key] * (1 + args.threshold) and new[key] - old[key] > args.min_seconds:
+                notes.append(f"{key} {old[key] * 1000:.1f}ms -> {new[key] * 1000:.1f}ms")
+        if "peak_kib" in old and "peak_kib" in new:
+            if new["peak_kib"] > old["peak_kib"] * (1 + args.threshold):
+                notes.append(f"peak {old['peak_kib']:.0f}KiB -> {new['peak_kib']:.0f}KiB")
+        for key in ("segments", "commands"):
+            if new[key] != old[key]:
+                notes.append(f"{key} {old[key]} -> {new[key]}")
+        if notes:
+            regressions += 1
+            print(f"{name}: " + "; ".join(notes))
+
+    for name in sorted(set(before) ^ set(after)):
+        print(f"{name}: only in {'before' if name in before else 'after'}")
+
+    total_old = sum(before[n]["generate_s"] + before[n]["emit_s"] for n in set(before) & set(after))
+    total_new = sum(after[n]["generate_s"] + after[n]["emit_s"] for n in set(before) & set(after))
+    print(f"total {total_old:.3f}s -> {total_new:.3f}s, {regressions} case(s) changed")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the living hinge engine.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="run the benchmark cases")
+    run_p.add_argument("-o", "--output", help="write JSON results here instead of stdout")
+    run_p.add_argument("--backend", default="python", choices=("python", "numpy"))
+    run_p.add_argument("--tolerance", type=float,
+                       help="curve chord tolerance (default: fixed 12 steps per curve)")
+    run_p.add_argument("--pattern", action="append", help="only run this pattern (repeatable)")
+    run_p.add_argument("--repeat", type=int, default=3, help="keep the best of N timing runs")
+    run_p.add_argument("--quick", action="store_true", help="smaller outlines and fewer variants")
+    run_p.add_argument("--no-memory", dest="memory", action="store_false",
+                       help="skip the tracemalloc peak-memory pass")
+    run_p.add_argument("--no-stitch", dest="stitch", action="store_false",
+                       help="emit raw segments instead of stitched strokes")
+    run_p.set_defaults(func=run)
+
+    cmp_p = sub.add_parser("compare", help="compare two result files")
+    cmp_p.add_argument("before")
+    cmp_p.add_argument("after")
+    cmp_p.add_argument("--threshold", type=float, default=0.10,
+                       help="relative slowdown that counts as a regression")
+    cmp_p.add_argument("--min-seconds", type=float, default=0.005,
+                       help="ignore slowdowns smaller than this")
+    cmp_p.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,7 @@
 
 #################################################
 #
-#  KM Living Hinge 
+#  KM Living Hinge
 #  A highly opinionated living hinge generator
 #
 #  With love, by Jondale
@@ -10,198 +10,352 @@
 #################################################
 
 import math
+import os
+import tempfile
+from itertools import chain
+
 import inkex
 from inkex import ShapeElement, bezier
+from lxml import etree
+
+from livinghinge import (
+    PreparedOutline,
+    TemplateCell,
+    _formatter,
+    iter_path_data,
+    stitch_segments,
+    superpath_to_polygons,
+)
+from livinghinge_export import export_cells
+from livinghinge_job import (
+    DRAFT_FLATNESS,
+    add_hinge_arguments,
+    hinge_arguments,
+    final_quality,
+    is_draft,
+    new_profile,
+    polygons_bbox,
+    profile_phase,
+    run_hinge_job,
+    shape_hash,
+    stale_shapes,
+)
+
+# Set on each shape's group of hinge paths, so a later run can tell whether
+# that shape's hinge is still current.
+SOURCE_ATTR = "data-hinge-source"
+HASH_ATTR = "data-hinge-hash"
+BBOX_ATTR = "data-hinge-bbox"
+
+
+def segments_to_svg_paths(polylines, stroke_style, group, profile=None, single=False,
+                          precision=None):
+    # single puts every cell in one path, which is far quicker for Inkscape
+    # to build and draw. stroke_style may be None when the group carries it.
+    path_data = iter_path_data(polylines, profile, precision)
+    if single:
+        path_data = [" ".join(path_data)]
+    for d in path_data:
+        if not d:
+            continue
+        path = inkex.PathElement()
+        if stroke_style is not None:
+            path.style = stroke_style
+        path.set("d", d)
+        group.add(path)
+
+
+def cells_to_svg_frame(cells, group, svg, precision, profile=None, stitch=True):
+    # Frame-space output, styled by the group: each template is drawn once in
+    # a <defs> inside the group and its interior cells become <use>
+    # references to it; clipped cells are ordinary paths.
+    fmt = _formatter(precision)
+    defs = None
+    refs = {}
+    for cell in cells:
+        if not isinstance(cell, TemplateCell):
+            segments_to_svg_paths([cell], None, group, profile, precision=precision)
+            continue
+        ref = refs.get(id(cell.template))
+        if ref is None:
+            if defs is None:
+                defs = inkex.Defs()
+                group.insert(0, defs)
+            strokes = stitch_segments(list(cell.template)) if stitch else cell.template
+            path = inkex.PathElement(id=svg.get_unique_id("km-hinge-cell"))
+            path.set("d", next(iter_path_data([strokes], precision=precision), ""))
+            defs.add(path)
+            # Holding the template keeps its id from being reused.
+            ref = refs[id(cell.template)] = ("#" + path.get("id"), cell.template)
+        use = inkex.Use()
+        use.set("xlink:href", ref[0])
+        use.set("x", fmt(cell.origin[0]))
+        use.set("y", fmt(cell.origin[1]))
+        group.add(use)
+
+
+def iter_shapes(elem):
+    if isinstance(elem, ShapeElement) and not isinstance(elem, inkex.Group):
+        yield elem
+    if isinstance(elem, inkex.Group):
+        for child in elem.iterdescendants():
+            if isinstance(child, ShapeElement) and not isinstance(child, inkex.Group):
+                yield child
+        return
+    for child in elem.iterdescendants():
+        if isinstance(child, ShapeElement) and not isinstance(child, inkex.Group):
+            yield child
+
+
+def _in_hinge_output(shape):
+    parent = shape.getparent()
+    while parent is not None:
+        if parent.get(SOURCE_ATTR) is not None:
+            return True
+        parent = parent.getparent()
+    return False
+
+
+def collect_shapes(elems):
+    seen_shapes = set()
+    shapes_to_process = []
+    for elem in elems:
+        for shape in iter_shapes(elem):
+            if _in_hinge_output(shape):
+                continue
+            key = getattr(shape, "get_id", lambda: None)() or shape.get("id") or id(shape)
+            if key in seen_shapes:
+                continue
+            seen_shapes.add(key)
+            shapes_to_process.append(shape)
+    return shapes_to_process
+
+
+def shape_polygons(shape, flatness=0.25):
+    shape_path = shape.to_path_element().path.transform(shape.composed_transform())
+    csp = shape_path.to_superpath()
+    bezier.cspsubdiv(csp, flatness)
+    return superpath_to_polygons(csp)
+
+
+def _hinge_job(svg, shapes_to_process, opts, profile, msg=None):
+    # Hinge arguments and flattened outlines for the selected shapes.
+    min_x, min_y, max_x, max_y = float('inf'), float('inf'), float('-inf'), float('-inf')
+    for shape in shapes_to_process:
+        bbox = shape.bounding_box(shape.composed_transform())
+        if bbox:
+            min_x = min(min_x, bbox.left)
+            min_y = min(min_y, bbox.top)
+            max_x = max(max_x, bbox.right)
+            max_y = max(max_y, bbox.bottom)
+    bbox_width = max_x - min_x
+    bbox_height = max_y - min_y
+    bbox = (min_x, min_y, bbox_width, bbox_height)
+
+    angle_rad = math.radians(float(opts.angle))
+
+    def _uu(value):
+        return float(svg.unittouu(f"{value}{opts.units}"))
+
+    try:
+        hinge_args = hinge_arguments(opts, bbox, _uu, angle_rad, msg)
+    except ValueError as err:
+        raise inkex.AbortExtension(str(err))
+
+    flatness = DRAFT_FLATNESS if is_draft(opts) else 0.25
+    shapes = []
+    shape_polys = []
+    for shape in shapes_to_process:
+        with profile_phase(profile, "flatten"):
+            polygons = shape_polygons(shape, flatness)
+        if polygons:
+            shapes.append(shape)
+            shape_polys.append(polygons)
+    return hinge_args, shapes, shape_polys
+
+
+def _report_job(svg, report, unit, msg):
+    if not msg:
+        return
+    deduper = report.get("dedupe")
+    if deduper is not None and deduper.removed:
+        msg(f"Duplicate cuts removed: {svg.uutounit(deduper.removed, unit):.1f}{unit}")
+    if "travel" in report:
+        before, after = report["travel"]
+        msg(
+            f"Cut order travel: {svg.uutounit(before, unit):.1f}{unit} "
+            f"-> {svg.uutounit(after, unit):.1f}{unit}"
+        )
+    cache = report.get("cache")
+    if cache is not None and cache.hits:
+        msg("Hinge taken from the cache.")
+
+
+def _previous_output(svg, sources):
+    # Shape groups an earlier run left for these sources, as
+    # {source: (group, hash, bbox)}.
+    found = {}
+    for group in svg.xpath(f"//svg:g[@{SOURCE_ATTR}]"):
+        source = group.get(SOURCE_ATTR)
+        if source not in sources or source in found:
+            continue
+        try:
+            bbox = tuple(float(v) for v in group.get(BBOX_ATTR, "").split())
+        except ValueError:
+            bbox = ()
+        if len(bbox) != 4:
+            found[source] = (group, None, None)
+        else:
+            found[source] = (group, group.get(HASH_ATTR), bbox)
+    return found
+
+
+def add_hinge(svg, shapes_to_process, opts, msg=None, profile=None):
+    # Fills every shape with the hinge pattern, one group per shape inside a
+    # hinge group on the current layer. With opts.incremental, a shape whose
+    # hash matches the group an earlier run left for it keeps that group, and
+    # only the others are generated and swapped in. Shared by the extension
+    # and the batch CLI.
+    hinge_args, shapes, shape_polys = _hinge_job(svg, shapes_to_process, opts, profile, msg)
+
+    stroke_width = float(svg.unittouu("0.25mm"))
+    stroke_style = {
+        "stroke": "#000000",
+        "stroke-width": str(stroke_width),
+        "fill": "none",
+        "stroke-linecap": "round",
+    }
+
+    current = [
+        (shape.get_id(), shape_hash(polygons, hinge_args, opts), polygons_bbox([polygons]))
+        for shape, polygons in zip(shapes, shape_polys)
+    ]
+    previous = {}
+    if opts.incremental:
+        previous = _previous_output(svg, {source for source, _, _ in current})
+    stale = sorted(stale_shapes(
+        current,
+        {source: (key, bbox) for source, (_, key, bbox) in previous.items()},
+        hinge_args.get("dedupe"),
+    ))
+
+    if previous:
+        hinge_group = next(iter(previous.values()))[0].getparent()
+    else:
+        hinge_group = inkex.Group(id=svg.get_unique_id("km-living-hinge"))
+        hinge_group.set("{http://www.inkscape.org/namespaces/inkscape}label", "KM Living Hinge")
+        svg.get_current_layer().add(hinge_group)
+
+    outlines = None
+    if opts.frame_output:
+        # The cuts stay in each shape's lattice frame and its group rotates
+        # them into place; the prepared outlines give the rotation centres.
+        hinge_args = dict(hinge_args, frame_space=True)
+        outlines = [
+            PreparedOutline(shape_polys[index], hinge_args["angle_rad"], hinge_args["simplify"])
+            for index in stale
+        ]
+    results, report = run_hinge_job(
+        [shape_polys[index] for index in stale], hinge_args, opts, profile, outlines=outlines
+    )
+    for n, (index, cells) in enumerate(zip(stale, results)):
+        source, key, bbox = current[index]
+        shape_group = inkex.Group(id=svg.get_unique_id("km-living-hinge"))
+        shape_group.set(SOURCE_ATTR, source)
+        shape_group.set(HASH_ATTR, key)
+        shape_group.set(BBOX_ATTR, " ".join(repr(v) for v in bbox))
+        if source in previous:
+            previous[source][0].replace_with(shape_group)
+        else:
+            hinge_group.add(shape_group)
+        with profile_phase(profile, "emit"):
+            if outlines is None:
+                segments_to_svg_paths(
+                    cells, stroke_style, shape_group, profile, single=is_draft(opts)
+                )
+                continue
+            shape_group.style = stroke_style
+            angle_rad = hinge_args["angle_rad"]
+            if angle_rad:
+                cx, cy = outlines[n].frame[:2]
+                # Set the text directly; inkex would round it to a 6-digit matrix.
+                etree.ElementBase.set(
+                    shape_group, "transform",
+                    f"rotate({math.degrees(angle_rad)!r},{cx!r},{cy!r})",
+                )
+            if is_draft(opts):
+                segments_to_svg_paths(
+                    cells, None, shape_group, profile, single=True, precision=opts.precision
+                )
+            else:
+                cells_to_svg_frame(
+                    cells, shape_group, svg, opts.precision, profile, stitch=opts.stitch
+                )
 
-from shapes import get_shape, get_config
-from livinghinge import generate_hinge, segments_to_svg_paths
+    if outlines:
+        # Declare xlink once on the root instead of on every <use>.
+        etree.cleanup_namespaces(svg, top_nsmap={"xlink": "http://www.w3.org/1999/xlink"})
+
+    kept = len(current) - len(stale)
+    if kept and msg:
+        msg(f"Kept the hinge of {kept} unchanged shape{'s' if kept != 1 else ''}")
+    _report_job(svg, report, opts.units, msg)
+    return hinge_group
+
+
+def export_hinge(svg, shapes_to_process, opts, path, msg=None, profile=None):
+    # Writes the hinge to a DXF or SVG file in opts.units (mm for px) and
+    # leaves the document alone. Returns the number of cells written.
+    if is_draft(opts) and msg:
+        msg("Draft quality is for previews; exporting at final quality.")
+    opts = final_quality(opts)
+    hinge_args, _, shape_polys = _hinge_job(svg, shapes_to_process, opts, profile, msg)
+    if not shape_polys:
+        return 0
+    unit = "mm" if opts.units == "px" else opts.units
+    results, report = run_hinge_job(shape_polys, hinge_args, opts, profile)
+    with profile_phase(profile, "write"):
+        count = export_cells(
+            path, opts.export, chain.from_iterable(results), polygons_bbox(shape_polys),
+            unit=unit, scale=svg.uutounit(1.0, unit), precision=opts.precision,
+        )
+    _report_job(svg, report, opts.units, msg)
+    return count
 
 
 class KMLivingHinge(inkex.EffectExtension):
     def add_arguments(self, pars) -> None:
-        pars.add_argument("--units", default="mm")
-        pars.add_argument("--angle", type=float, default=0.0)
-        pars.add_argument("--type", default="line")
-        pars.add_argument("--line_height_pct", type=int, default=80)
-        pars.add_argument("--line_x_spacing", type=float, default=2.0)
-        pars.add_argument("--line_y_spacing", type=float, default=2.0)
-        pars.add_argument("--fishbone_height", type=float, default=10.0)
-        pars.add_argument("--fishbone_width", type=float, default=5.0)
-        pars.add_argument("--fishbone_x_spacing", type=float, default=2.0)
-        pars.add_argument("--fishbone_y_spacing", type=float, default=2.0)
-        pars.add_argument("--cross_height", type=float, default=10.0)
-        pars.add_argument("--cross_width", type=float, default=5.0)
-        pars.add_argument("--bezier_height", type=float, default=10.0)
-        pars.add_argument("--bezier_width", type=float, default=5.0)
-        pars.add_argument("--bezier_x_spacing", type=float, default=2.0)
-        pars.add_argument("--bezier_y_spacing", type=float, default=2.0)
-        pars.add_argument("--wave_height", type=float, default=10.0)
-        pars.add_argument("--wave_width", type=float, default=5.0)
-        pars.add_argument("--fabric_height", type=float, default=10.0)
-        pars.add_argument("--fabric_width", type=float, default=5.0)
-        pars.add_argument("--circle_height", type=float, default=5.0)
-        pars.add_argument("--circle_width", type=float, default=5.0)
-        pars.add_argument("--circle_x_spacing", type=float, default=2.0)
-        pars.add_argument("--circle_y_spacing", type=float, default=2.0)
+        add_hinge_arguments(pars, boolean=inkex.Boolean)
 
     def effect(self) -> None:
-        opts = self.options
-        pattern_type = opts.type or "line"
-        if pattern_type not in ("line", "fishbone", "cross", "bezier", "wave", "fabric", "circle"):
-            pattern_type = "line"
-
         selection = getattr(self.svg, "selection", None)
         if not selection or len(selection) == 0:
             raise inkex.AbortExtension(
                 "Select a shape (path, rectangle, circle, etc.); the hinge fills and is trimmed to your selection."
             )
-        selected_elems = list(selection)
-
-        def _uu(value, unit):
-            return float(self.svg.unittouu(f"{value}{unit}"))
-
-        def _superpath_to_polygons(superpath):
-            polys = []
-            for sub in superpath:
-                if not sub:
-                    continue
-                poly = []
-                for node in sub:
-                    if len(node) >= 2 and len(node[1]) == 2:
-                        poly.append((node[1][0], node[1][1]))
-                if len(poly) >= 3:
-                    if poly[0] != poly[-1]:
-                        poly.append(poly[0])
-                    polys.append(poly)
-            return polys
-
-        seen_shapes = set()
-        shapes_to_process = []
-
-        def _iter_shapes(elem):
-            if isinstance(elem, ShapeElement) and not isinstance(elem, inkex.Group):
-                yield elem
-            if isinstance(elem, inkex.Group):
-                for child in elem.iterdescendants():
-                    if isinstance(child, ShapeElement) and not isinstance(child, inkex.Group):
-                        yield child
-                return
-            for child in elem.iterdescendants():
-                if isinstance(child, ShapeElement) and not isinstance(child, inkex.Group):
-                    yield child
-
-        for elem in selected_elems:
-            for shape in _iter_shapes(elem):
-                key = getattr(shape, "get_id", lambda: None)() or shape.get("id") or id(shape)
-                if key in seen_shapes:
-                    continue
-                seen_shapes.add(key)
-                shapes_to_process.append(shape)
 
+        shapes_to_process = collect_shapes(list(selection))
         if not shapes_to_process:
             raise inkex.AbortExtension("Unable to read the selected shape geometry.")
 
-        min_x, min_y, max_x, max_y = float('inf'), float('inf'), float('-inf'), float('-inf')
-        for shape in shapes_to_process:
-            bbox = shape.bounding_box(shape.composed_transform())
-            if bbox:
-                min_x = min(min_x, bbox.left)
-                min_y = min(min_y, bbox.top)
-                max_x = max(max_x, bbox.right)
-                max_y = max(max_y, bbox.bottom)
-        bbox_width = max_x - min_x
-        bbox_height = max_y - min_y
-        bbox = (min_x, min_y, bbox_width, bbox_height)
-
-        unit = opts.units
-        angle_rad = math.radians(float(opts.angle))
-
-        if pattern_type == "line":
-            height = opts.line_height_pct / 100.0
-            width = 0
-            x_spacing = _uu(opts.line_x_spacing, unit)
-            y_spacing = _uu(opts.line_y_spacing, unit)
-        elif pattern_type == "fishbone":
-            height = _uu(opts.fishbone_height, unit)
-            width = _uu(opts.fishbone_width, unit)
-            x_spacing = _uu(opts.fishbone_x_spacing, unit)
-            y_spacing = _uu(opts.fishbone_y_spacing, unit)
-        elif pattern_type == "cross":
-            height = _uu(opts.cross_height, unit)
-            width = _uu(opts.cross_width, unit)
-            x_spacing = 0
-            y_spacing = 0
-        elif pattern_type == "bezier":
-            height = _uu(opts.bezier_height, unit)
-            width = _uu(opts.bezier_width, unit)
-            x_spacing = _uu(opts.bezier_x_spacing, unit)
-            y_spacing = _uu(opts.bezier_y_spacing, unit)
-        elif pattern_type == "wave":
-            height = _uu(opts.wave_height, unit)
-            width = _uu(opts.wave_width, unit)
-            x_spacing = 0
-            y_spacing = 0
-        elif pattern_type == "fabric":
-            height = _uu(opts.fabric_height, unit)
-            width = _uu(opts.fabric_width, unit)
-            x_spacing = 0
-            y_spacing = 0
-        elif pattern_type == "circle":
-            height = _uu(opts.circle_height, unit)
-            width = _uu(opts.circle_width, unit)
-            x_spacing = _uu(opts.circle_x_spacing, unit)
-            y_spacing = _uu(opts.circle_y_spacing, unit)
+        profile = new_profile(self.options)
+        if self.options.export == "document":
+            add_hinge(self.svg, shapes_to_process, self.options, self.msg, profile)
         else:
-            height = opts.line_height_pct / 100.0
-            width = 0
-            x_spacing = _uu(opts.line_x_spacing, unit)
-            y_spacing = _uu(opts.line_y_spacing, unit)
-
-        config_fn = get_config(pattern_type)
-        height, width, x_spacing, y_spacing, y_offset = config_fn(
-            height, width, x_spacing, y_spacing, bbox
-        )
-
-        if height <= 0:
-            raise inkex.AbortExtension("Height must be greater than zero.")
-        if width < 0:
-            raise inkex.AbortExtension("Width must not be negative.")
-
-        stroke_width = float(self.svg.unittouu("0.25mm"))
-        stroke_style = {
-            "stroke": "#000000",
-            "stroke-width": str(stroke_width),
-            "fill": "none",
-            "stroke-linecap": "round",
-        }
-
-        parent = self.svg.get_current_layer()
-        hinge_group = inkex.Group(id=self.svg.get_unique_id("km-living-hinge"))
-        hinge_group.set("{http://www.inkscape.org/namespaces/inkscape}label", "KM Living Hinge")
-        parent.add(hinge_group)
-
-        shape_fn = get_shape(pattern_type)
-
-        for shape in shapes_to_process:
-            shape_path = shape.to_path_element().path.transform(shape.composed_transform())
-            csp = shape_path.to_superpath()
-            bezier.cspsubdiv(csp, 0.25)
-            polygons = _superpath_to_polygons(csp)
-            if not polygons:
-                continue
-
-            segments = generate_hinge(
-                polygons=polygons,
-                shape_fn=shape_fn,
-                height=height,
-                width=width,
-                x_spacing=x_spacing,
-                y_spacing=y_spacing,
-                y_offset=y_offset,
-                angle_rad=angle_rad,
+            path = self.options.export_path or self._sidecar_path(f".hinge.{self.options.export}")
+            count = export_hinge(self.svg, shapes_to_process, self.options, path, self.msg, profile)
+            self.msg(f"Wrote {count} hinge cells to {path}")
+        if profile is not None:
+            profile.write(
+                self._sidecar_path(".hinge-profile.json") if self.options.profile == "json" else None
             )
 
-            segments_to_svg_paths(segments, stroke_style, hinge_group)
+    def _sidecar_path(self, suffix):
+        # Next to the document when it has been saved, else the temp dir.
+        doc_path = self.document_path()
+        if doc_path:
+            return os.path.splitext(doc_path)[0] + suffix
+        return os.path.join(tempfile.gettempdir(), "km-living-hinge" + suffix)
 
 
 if __name__ == "__main__":
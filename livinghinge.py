@@ -3,7 +3,9 @@
 # - Cuts off shapes at intersection points
 
 import math
-import inkex
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from time import perf_counter
 
 
 def _sample_quadratic(p0, control, p1, steps=12):
@@ -34,29 +36,269 @@ def _sample_cubic(p0, c1, c2, p1, steps=12):
     return pts
 
 
-def _segment_intersections(p0, p1, polygons):
-    x0, y0 = p0
-    x1, y1 = p1
-    ts = []
+# Deepest subdivision for adaptive flattening: at most 2**10 segments a curve.
+_MAX_FLATTEN_DEPTH = 10
+
+
+def _chord_distance(pt, a, b):
+    dx = b[0] - a[0]
+    dy = b[1] - a[1]
+    length = math.hypot(dx, dy)
+    if length == 0:
+        return math.hypot(pt[0] - a[0], pt[1] - a[1])
+    return abs((pt[0] - a[0]) * dy - (pt[1] - a[1]) * dx) / length
+
+
+def _mid(a, b):
+    return ((a[0] + b[0]) * 0.5, (a[1] + b[1]) * 0.5)
+
+
+def _flatten_quadratic(p0, control, p1, tolerance, pts, depth=0):
+    # Appends the points after p0. A quadratic strays at most half its
+    # control point's distance from the chord.
+    if depth >= _MAX_FLATTEN_DEPTH or _chord_distance(control, p0, p1) * 0.5 <= tolerance:
+        pts.append(p1)
+        return
+    q = _mid(p0, control)
+    r = _mid(control, p1)
+    m = _mid(q, r)
+    _flatten_quadratic(p0, q, m, tolerance, pts, depth + 1)
+    _flatten_quadratic(m, r, p1, tolerance, pts, depth + 1)
+
+
+def _flatten_cubic(p0, c1, c2, p1, tolerance, pts, depth=0):
+    # A cubic strays at most 3/4 of its farthest control point's distance.
+    flat = max(_chord_distance(c1, p0, p1), _chord_distance(c2, p0, p1)) * 0.75
+    if depth >= _MAX_FLATTEN_DEPTH or flat <= tolerance:
+        pts.append(p1)
+        return
+    a = _mid(p0, c1)
+    b = _mid(c1, c2)
+    c = _mid(c2, p1)
+    ab = _mid(a, b)
+    bc = _mid(b, c)
+    m = _mid(ab, bc)
+    _flatten_cubic(p0, a, ab, m, tolerance, pts, depth + 1)
+    _flatten_cubic(m, bc, c, p1, tolerance, pts, depth + 1)
+
+
+def _polygon_edges(polygons):
+    edges = []
     for poly in polygons:
         for i in range(len(poly) - 1):
             x2, y2 = poly[i]
             x3, y3 = poly[i + 1]
-            denom = (x1 - x0) * (y3 - y2) - (y1 - y0) * (x3 - x2)
-            if math.isclose(denom, 0.0, abs_tol=1e-12):
-                continue
-            t = ((x2 - x0) * (y3 - y2) - (y2 - y0) * (x3 - x2)) / denom
-            u = ((x2 - x0) * (y1 - y0) - (y2 - y0) * (x1 - x0)) / denom
-            if -1e-9 <= t <= 1 + 1e-9 and -1e-9 <= u <= 1 + 1e-9:
-                ts.append(max(0.0, min(1.0, t)))
+            edges.append((x2, y2, x3, y3))
+    return edges
+
+
+class _EdgeGrid:
+    # Uniform grid over the polygon edges so a segment only tests the edges
+    # whose buckets its bounding box touches.
+
+    def __init__(self, polygons, eps=1e-9):
+        self.edges = _polygon_edges(polygons)
+        self.owners = [
+            index for index, poly in enumerate(polygons) for _ in range(len(poly) - 1)
+        ]
+        self.buckets = {}
+        self.eps = eps
+        # Candidate edges handed out by queries; None until a profiled run
+        # starts counting.
+        self.tested = None
+        if not self.edges:
+            self.min_x = self.min_y = self.max_x = self.max_y = 0.0
+            self.cell = 1.0
+            return
+
+        xs = [e[0] for e in self.edges] + [e[2] for e in self.edges]
+        ys = [e[1] for e in self.edges] + [e[3] for e in self.edges]
+        self.min_x = min(xs)
+        self.min_y = min(ys)
+        self.max_x = max(xs)
+        self.max_y = max(ys)
+        span_x = self.max_x - self.min_x
+        span_y = self.max_y - self.min_y
+        area = max(span_x * span_y, max(span_x, span_y) ** 2 / len(self.edges), 1e-12)
+        self.cell = max(math.sqrt(area / len(self.edges)) * 2.0, 1e-9)
+
+        for index, (x2, y2, x3, y3) in enumerate(self.edges):
+            i0, j0, i1, j1 = self._cell_range(x2, y2, x3, y3)
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    self.buckets.setdefault((i, j), []).append(index)
+
+    def _cell_range(self, xa, ya, xb, yb):
+        eps = self.eps
+        inv = 1.0 / self.cell
+        i0 = int(math.floor((min(xa, xb) - eps - self.min_x) * inv))
+        i1 = int(math.floor((max(xa, xb) + eps - self.min_x) * inv))
+        j0 = int(math.floor((min(ya, yb) - eps - self.min_y) * inv))
+        j1 = int(math.floor((max(ya, yb) + eps - self.min_y) * inv))
+        return i0, j0, i1, j1
+
+    def query_ids(self, xa, ya, xb, yb):
+        i0, j0, i1, j1 = self._cell_range(xa, ya, xb, yb)
+        buckets = self.buckets
+        if i0 == i1 and j0 == j1:
+            hits = buckets.get((i0, j0)) or []
+            if self.tested is not None:
+                self.tested += len(hits)
+            return hits
+
+        seen = set()
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                hits = buckets.get((i, j))
+                if hits:
+                    seen.update(hits)
+        if self.tested is not None:
+            self.tested += len(seen)
+        return sorted(seen)
+
+    def query(self, xa, ya, xb, yb):
+        edges = self.edges
+        return [edges[k] for k in self.query_ids(xa, ya, xb, yb)]
+
+    def box_is_clear(self, xa, ya, xb, yb):
+        eps = self.eps
+        for x2, y2, x3, y3 in self.query(xa, ya, xb, yb):
+            if (min(x2, x3) <= xb + eps and max(x2, x3) >= xa - eps and
+                    min(y2, y3) <= yb + eps and max(y2, y3) >= ya - eps):
+                return False
+        return True
+
+
+class _Scanlines:
+    # Inside intervals of axis-parallel lines through the outline, cached per
+    # line. Straight vertical or horizontal template runs are clipped against
+    # these instead of going through _clip_segment one piece at a time.
+
+    def __init__(self, edge_grid):
+        self.edge_grid = edge_grid
+        self.columns = {}
+        self.rows = {}
+
+    def vertical(self, x):
+        # (spans, on_edge) for the line at x; see _line_intervals.
+        found = self.columns.get(x)
+        if found is None:
+            grid = self.edge_grid
+            ids = grid.query_ids(x, grid.min_y, x, grid.max_y)
+            found = self.columns[x] = _line_intervals(x, ids, grid, 0)
+        return found
+
+    def horizontal(self, y):
+        found = self.rows.get(y)
+        if found is None:
+            grid = self.edge_grid
+            ids = grid.query_ids(grid.min_x, y, grid.max_x, y)
+            found = self.rows[y] = _line_intervals(y, ids, grid, 1)
+        return found
+
+
+def _line_intervals(coord, edge_ids, edge_grid, axis):
+    # Split the line at every edge crossing, like _clip_segment does, and keep
+    # the pieces that are inside an odd number of times for some polygon.
+    # When an edge lies along the line, parity cannot tell which side a run
+    # on it belongs to. The line is then cut at every edge it meets or
+    # overlaps and all intervals are returned with on_edge set, so the caller
+    # keeps each piece by its midpoint as _clip_segment does.
+    crossings = []
+    edges = edge_grid.edges
+    owners = edge_grid.owners
+    eps = edge_grid.eps
+    on_edge = False
+    for k in edge_ids:
+        e = edges[k]
+        a1, b1, a2, b2 = (e[0], e[1], e[2], e[3]) if axis == 0 else (e[1], e[0], e[3], e[2])
+        if abs(a1 - coord) <= eps and abs(a2 - coord) <= eps:
+            on_edge = True
+        if (a1 > coord) != (a2 > coord):
+            crossings.append((b1 + (b2 - b1) * (coord - a1) / (a2 - a1), owners[k]))
+    crossings.sort()
+
+    if on_edge:
+        cuts = {b for b, _ in crossings}
+        for k in edge_ids:
+            e = edges[k]
+            a1, b1, a2, b2 = (e[0], e[1], e[2], e[3]) if axis == 0 else (e[1], e[0], e[3], e[2])
+            if abs(a1 - coord) <= eps:
+                cuts.add(b1)
+            if abs(a2 - coord) <= eps:
+                cuts.add(b2)
+        cuts = sorted(cuts)
+        return list(zip(cuts, cuts[1:])), True
+
+    spans = []
+    odd = set()
+    for i in range(len(crossings) - 1):
+        odd ^= {crossings[i][1]}
+        if odd:
+            spans.append((crossings[i][0], crossings[i + 1][0]))
+    return spans, False
+
+
+def _clip_to_spans(a, b, spans):
+    # Pieces of the run a..b (either direction) that lie in the sorted spans,
+    # ordered from a to b.
+    lo_run, hi_run = (a, b) if a <= b else (b, a)
+    min_len = (hi_run - lo_run) * 1e-6
+    pieces = []
+    for lo, hi in spans:
+        if hi <= lo_run:
+            continue
+        if lo >= hi_run:
+            break
+        s = lo if lo > lo_run else lo_run
+        e = hi if hi < hi_run else hi_run
+        if e - s >= min_len:
+            pieces.append((s, e))
+    if a > b:
+        pieces = [(e, s) for s, e in reversed(pieces)]
+    return pieces
+
+
+_CELL_EXTERIOR = 0
+_CELL_INTERIOR = 1
+_CELL_BOUNDARY = 2
+
+
+def _classify_cell(box, edge_grid, point_in_polys):
+    # A box no edge passes through lies entirely on one side of the outline,
+    # so one containment test settles the whole cell.
+    x0, y0, x1, y1 = box
+    if not edge_grid.box_is_clear(x0, y0, x1, y1):
+        return _CELL_BOUNDARY
+    if point_in_polys(((x0 + x1) * 0.5, (y0 + y1) * 0.5)):
+        return _CELL_INTERIOR
+    return _CELL_EXTERIOR
+
+
+def _edge_intersections(p0, p1, edges):
+    x0, y0 = p0
+    x1, y1 = p1
+    ts = []
+    for x2, y2, x3, y3 in edges:
+        denom = (x1 - x0) * (y3 - y2) - (y1 - y0) * (x3 - x2)
+        if math.isclose(denom, 0.0, abs_tol=1e-12):
+            continue
+        t = ((x2 - x0) * (y3 - y2) - (y2 - y0) * (x3 - x2)) / denom
+        u = ((x2 - x0) * (y1 - y0) - (y2 - y0) * (x1 - x0)) / denom
+        if -1e-9 <= t <= 1 + 1e-9 and -1e-9 <= u <= 1 + 1e-9:
+            ts.append(max(0.0, min(1.0, t)))
     return ts
 
 
-def _clip_segment(p0, p1, polygons, point_in_polys):
+def _segment_intersections(p0, p1, polygons):
+    return _edge_intersections(p0, p1, _polygon_edges(polygons))
+
+
+def _clip_segment(p0, p1, edge_grid, point_in_polys):
     x0, y0 = p0
     x1, y1 = p1
     ts = [0.0, 1.0]
-    ts.extend(_segment_intersections(p0, p1, polygons))
+    ts.extend(_edge_intersections(p0, p1, edge_grid.query(x0, y0, x1, y1)))
     ts = sorted(set(ts))
     segs = []
     for i in range(len(ts) - 1):
@@ -72,6 +314,140 @@ def _clip_segment(p0, p1, polygons, point_in_polys):
     return segs
 
 
+class Bezier(tuple):
+    # A curve stroke: the control points of one quadratic (3 points) or cubic
+    # (4 points) curve. Slicing keeps the type, so stroke[::-1] is the same
+    # curve traced backwards and the endpoints are stroke[0] and stroke[-1].
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        item = tuple.__getitem__(self, key)
+        return Bezier(item) if isinstance(key, slice) else item
+
+
+class TemplateCell(list):
+    # An interior cell in frame space: the strokes of template moved by
+    # origin. Emitters may draw it as a reference to one shared template
+    # path; everything else can treat it as a plain list of strokes.
+    __slots__ = ("origin", "template")
+
+    def __init__(self, strokes, origin, template):
+        list.__init__(self, strokes)
+        self.origin = origin
+        self.template = template
+
+
+def _split_bezier(ctrl, t):
+    # de Casteljau split of a control polygon (points or plain numbers).
+    left = [ctrl[0]]
+    right = [ctrl[-1]]
+    points = list(ctrl)
+    while len(points) > 1:
+        if isinstance(points[0], tuple):
+            points = [
+                (a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t)
+                for a, b in zip(points, points[1:])
+            ]
+        else:
+            points = [a + (b - a) * t for a, b in zip(points, points[1:])]
+        left.append(points[0])
+        right.append(points[-1])
+    return left, right[::-1]
+
+
+def _bezier_point(ctrl, t):
+    return _split_bezier(ctrl, t)[0][-1]
+
+
+def _bezier_piece(ctrl, ta, tb):
+    if tb < 1.0:
+        ctrl = _split_bezier(ctrl, tb)[0]
+    if ta > 0.0:
+        ctrl = _split_bezier(ctrl, ta / tb)[1]
+    return Bezier(ctrl)
+
+
+def _bernstein_roots(coeffs, t0, t1, roots, depth=0):
+    # Roots of a polynomial given by its Bernstein coefficients on [t0, t1].
+    # The curve lies in the hull of its coefficients, so a same-signed set
+    # has no root; otherwise halve until the hull is within 1e-9 of zero.
+    lo = min(coeffs)
+    hi = max(coeffs)
+    if lo > 0 or hi < 0:
+        return
+    if max(hi, -lo) <= 1e-9 or depth >= 48:
+        roots.append((t0 + t1) * 0.5)
+        return
+    left, right = _split_bezier(coeffs, 0.5)
+    mid = (t0 + t1) * 0.5
+    _bernstein_roots(left, t0, mid, roots, depth + 1)
+    _bernstein_roots(right, mid, t1, roots, depth + 1)
+
+
+def _polish_root(coeffs, t):
+    # A few Newton steps take the 1e-9 bracket down to rounding error; steps
+    # that would leave the bracket (near a tangency) are not taken.
+    degree = len(coeffs) - 1
+    deriv = [degree * (b - a) for a, b in zip(coeffs, coeffs[1:])]
+    for _ in range(3):
+        slope = _bezier_point(deriv, t)
+        if slope == 0:
+            break
+        step = _bezier_point(coeffs, t) / slope
+        if abs(step) > 1e-6 or not 0.0 <= t - step <= 1.0:
+            break
+        t -= step
+    return t
+
+
+def _curve_intersections(ctrl, edges):
+    ts = []
+    for x2, y2, x3, y3 in edges:
+        ex = x3 - x2
+        ey = y3 - y2
+        length_sq = ex * ex + ey * ey
+        if length_sq == 0:
+            continue
+        length = math.sqrt(length_sq)
+        # Signed distance from the edge's line, which is itself a Bezier
+        # polynomial with these control values.
+        coeffs = [((px - x2) * ey - (py - y2) * ex) / length for px, py in ctrl]
+        roots = []
+        _bernstein_roots(coeffs, 0.0, 1.0, roots)
+        for t in roots:
+            t = _polish_root(coeffs, t)
+            px, py = _bezier_point(ctrl, t)
+            u = ((px - x2) * ex + (py - y2) * ey) / length_sq
+            if -1e-9 <= u <= 1 + 1e-9:
+                ts.append(t)
+    return ts
+
+
+def _clip_curve(ctrl, edge_grid, point_in_polys):
+    # Split the curve where it crosses the outline and keep the inside runs
+    # as curves; neighbouring inside runs are joined back together.
+    xs = [p[0] for p in ctrl]
+    ys = [p[1] for p in ctrl]
+    ts = [0.0, 1.0]
+    ts.extend(_curve_intersections(ctrl, edge_grid.query(min(xs), min(ys), max(xs), max(ys))))
+    ts.sort()
+    pieces = []
+    start = end = None
+    for t0, t1 in zip(ts, ts[1:]):
+        if t1 - t0 < 1e-6:
+            continue
+        if point_in_polys(_bezier_point(ctrl, (t0 + t1) * 0.5)):
+            if start is None:
+                start = t0
+            end = t1
+        elif start is not None:
+            pieces.append(_bezier_piece(ctrl, start, end))
+            start = None
+    if start is not None:
+        pieces.append(_bezier_piece(ctrl, start, end))
+    return pieces
+
+
 def _point_in_poly(px, py, poly):
     inside = False
     n = len(poly)
@@ -85,7 +461,93 @@ def _point_in_poly(px, py, poly):
     return inside
 
 
-def _expand_shape_to_points(shape_data, offset_x, offset_y, width, height):
+class _Slabs:
+    # Even-odd containment over all polygons in O(log n). The plane is cut
+    # into horizontal slabs at every vertex y; a slab lists the edges that
+    # span it, sorted by the lowest x they can report for a point inside it.
+    # Edges entirely right of the point are counted from a suffix parity,
+    # edges entirely left are skipped, and only the few whose x-range holds
+    # the point are tested with the same arithmetic as _point_in_poly.
+    # Parity is a bitmask over the polygons present in the slab, so the
+    # answer is the same union of per-polygon tests as point_in_polys.
+
+    def __init__(self, polygons, limit=2_000_000):
+        edges = []
+        for index, poly in enumerate(polygons):
+            for i in range(len(poly) - 1):
+                (x1, y1), (x2, y2) = poly[i], poly[i + 1]
+                if y1 != y2:
+                    edges.append((x1, y1, x2, y2, index))
+        self.ys = sorted({e[1] for e in edges} | {e[3] for e in edges})
+
+        spans = []
+        total = 0
+        for edge in edges:
+            lo = bisect_left(self.ys, min(edge[1], edge[3]))
+            hi = bisect_left(self.ys, max(edge[1], edge[3]))
+            spans.append((lo, hi))
+            total += hi - lo
+        # A comb-like outline can make the table quadratic; callers fall
+        # back to the plain ray test when it would be too big.
+        self.ok = total <= limit
+        if not self.ok:
+            return
+
+        members = [[] for _ in range(max(len(self.ys) - 1, 0))]
+        for edge, (lo, hi) in zip(edges, spans):
+            for k in range(lo, hi):
+                members[k].append(edge)
+        self.slabs = [self._build_slab(k, slab_edges) for k, slab_edges in enumerate(members)]
+
+    def _build_slab(self, k, slab_edges):
+        ya, yb = self.ys[k], self.ys[k + 1]
+        local = {}
+        rows = []
+        exact = []
+        for x1, y1, x2, y2, owner in slab_edges:
+            bit = 1 << local.setdefault(owner, len(local))
+            dy = y2 - y1
+            if abs(dy) < 1e-6:
+                # The 1e-9 guard in _point_in_poly can throw x_int well
+                # off a nearly flat edge; always test those directly.
+                exact.append((x1, y1, x2, y2, bit))
+                continue
+            xa = x1 + (x2 - x1) * (ya - y1) / dy
+            xb = x1 + (x2 - x1) * (yb - y1) / dy
+            margin = abs(x2 - x1) * 2e-9 / abs(dy) + 1e-9 * (1.0 + abs(x1) + abs(x2))
+            rows.append((min(xa, xb) - margin, max(xa, xb) + margin, x1, y1, x2, y2, bit))
+        rows.sort()
+        los = [row[0] for row in rows]
+        width = max((row[1] - row[0] for row in rows), default=0.0)
+        suffix = [0] * (len(rows) + 1)
+        for i in range(len(rows) - 1, -1, -1):
+            suffix[i] = suffix[i + 1] ^ rows[i][6]
+        return los, rows, suffix, width, exact
+
+    def contains(self, px, py):
+        ys = self.ys
+        k = bisect_right(ys, py) - 1
+        if k < 0 or k >= len(ys) - 1:
+            return False
+        los, rows, suffix, width, exact = self.slabs[k]
+        right = bisect_right(los, px)
+        parity = suffix[right]
+        for i in range(bisect_left(los, px - width), right):
+            _, _, x1, y1, x2, y2, bit = rows[i]
+            if px < (x2 - x1) * (py - y1) / (y2 - y1 + 1e-9) + x1:
+                parity ^= bit
+        for x1, y1, x2, y2, bit in exact:
+            if px < (x2 - x1) * (py - y1) / (y2 - y1 + 1e-9) + x1:
+                parity ^= bit
+        return parity != 0
+
+    def contains_many(self, points):
+        contains = self.contains
+        return [contains(px, py) for px, py in points]
+
+
+def _expand_shape_to_points(shape_data, offset_x, offset_y, width, height, tolerance=None):
+    # Without a chord tolerance, curves fall back to a fixed 12 steps.
     polylines = []
 
     for segment in shape_data:
@@ -98,14 +560,22 @@ def _expand_shape_to_points(shape_data, offset_x, offset_y, width, height):
                 p0 = (points[0][0] + offset_x, points[0][1] + offset_y)
                 ctrl = (points[1][0] + offset_x, points[1][1] + offset_y)
                 p1 = (points[2][0] + offset_x, points[2][1] + offset_y)
-                pts = _sample_quadratic(p0, ctrl, p1)
+                if tolerance:
+                    pts = [p0]
+                    _flatten_quadratic(p0, ctrl, p1, tolerance, pts)
+                else:
+                    pts = _sample_quadratic(p0, ctrl, p1)
                 polylines.append(pts)
             elif seg_type == 'C':
                 p0 = (points[0][0] + offset_x, points[0][1] + offset_y)
                 c1 = (points[1][0] + offset_x, points[1][1] + offset_y)
                 c2 = (points[2][0] + offset_x, points[2][1] + offset_y)
                 p1 = (points[3][0] + offset_x, points[3][1] + offset_y)
-                pts = _sample_cubic(p0, c1, c2, p1)
+                if tolerance:
+                    pts = [p0]
+                    _flatten_cubic(p0, c1, c2, p1, tolerance, pts)
+                else:
+                    pts = _sample_cubic(p0, c1, c2, p1)
                 polylines.append(pts)
         else:
             pts = [(p[0] + offset_x, p[1] + offset_y) for p in segment]
@@ -114,7 +584,355 @@ def _expand_shape_to_points(shape_data, offset_x, offset_y, width, height):
     return polylines
 
 
-def generate_hinge(
+class _Template:
+    # One pattern cell flattened to (x0, y0, x1, y1) segments relative to the
+    # cell origin, so generation only has to translate it. In curve mode the
+    # Q/C parts are kept as control points in curves instead. strokes is the
+    # cell as drawn, shared by every frame-space TemplateCell built from this
+    # template, so emitters can key the shared path on it.
+    __slots__ = ("segments", "box", "axes", "curves", "strokes")
+
+    def __init__(self, segments, curves=()):
+        self.segments = tuple(segments)
+        self.curves = tuple(tuple(ctrl) for ctrl in curves)
+        self.strokes = tuple(
+            [[(x0, y0), (x1, y1)] for x0, y0, x1, y1 in self.segments]
+            + [Bezier(ctrl) for ctrl in self.curves]
+        )
+        # 0 for vertical runs, 1 for horizontal runs, None for anything else.
+        self.axes = tuple(
+            0 if x0 == x1 and y0 != y1 else 1 if y0 == y1 and x0 != x1 else None
+            for x0, y0, x1, y1 in self.segments
+        )
+        if self.segments or self.curves:
+            xs = [s[0] for s in self.segments] + [s[2] for s in self.segments]
+            ys = [s[1] for s in self.segments] + [s[3] for s in self.segments]
+            # A curve stays inside the hull of its control points.
+            xs += [p[0] for ctrl in self.curves for p in ctrl]
+            ys += [p[1] for ctrl in self.curves for p in ctrl]
+            self.box = (min(xs), min(ys), max(xs), max(ys))
+        else:
+            self.box = None
+
+
+def _build_template(shape_fn, height, width, shape_kwargs, tolerance=None, curves=False):
+    shape_data = shape_fn(height, width, **shape_kwargs)
+    curve_ctrls = []
+    if curves:
+        curve_ctrls = [
+            [(float(x), float(y)) for x, y in segment[1]]
+            for segment in shape_data
+            if isinstance(segment, tuple) and len(segment) == 2 and segment[0] in ('Q', 'C')
+        ]
+        shape_data = [
+            segment for segment in shape_data
+            if not (isinstance(segment, tuple) and len(segment) == 2 and segment[0] in ('Q', 'C'))
+        ]
+    segments = []
+    for polyline in _expand_shape_to_points(shape_data, 0.0, 0.0, width, height, tolerance):
+        for i in range(len(polyline) - 1):
+            (x0, y0), (x1, y1) = polyline[i], polyline[i + 1]
+            segments.append((x0, y0, x1, y1))
+    return _Template(segments, curve_ctrls)
+
+
+@lru_cache(maxsize=64)
+def _cached_template(shape_fn, height, width, kwargs_items, tolerance, curves):
+    return _build_template(shape_fn, height, width, dict(kwargs_items), tolerance, curves)
+
+
+def compile_template(shape_fn, height, width, shape_kwargs=None, tolerance=None, curves=False):
+    shape_kwargs = shape_kwargs or {}
+    try:
+        return _cached_template(
+            shape_fn, height, width, tuple(sorted(shape_kwargs.items())), tolerance, curves
+        )
+    except TypeError:
+        # Unhashable shape arguments; build without memoizing.
+        return _build_template(shape_fn, height, width, shape_kwargs, tolerance, curves)
+
+
+def superpath_to_polygons(superpath):
+    # Closed polygons from the node positions of a flattened superpath.
+    polys = []
+    for sub in superpath:
+        if not sub:
+            continue
+        poly = []
+        for node in sub:
+            if len(node) >= 2 and len(node[1]) == 2:
+                poly.append((node[1][0], node[1][1]))
+        if len(poly) >= 3:
+            if poly[0] != poly[-1]:
+                poly.append(poly[0])
+            polys.append(poly)
+    return polys
+
+
+def _segment_distance(pt, a, b):
+    dx = b[0] - a[0]
+    dy = b[1] - a[1]
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return math.hypot(pt[0] - a[0], pt[1] - a[1])
+    t = max(0.0, min(1.0, ((pt[0] - a[0]) * dx + (pt[1] - a[1]) * dy) / length_sq))
+    return math.hypot(pt[0] - a[0] - t * dx, pt[1] - a[1] - t * dy)
+
+
+def simplify_polygon(poly, tolerance):
+    # Douglas-Peucker on a closed ring. The ring is split at the vertex
+    # farthest from the first one so both halves have a proper chord.
+    pts = poly[:-1] if len(poly) > 1 and poly[0] == poly[-1] else list(poly)
+    if tolerance <= 0 or len(pts) < 4:
+        return poly
+
+    far = max(range(1, len(pts)), key=lambda i: math.hypot(
+        pts[i][0] - pts[0][0], pts[i][1] - pts[0][1]))
+    ring = pts + [pts[0]]
+    keep = [False] * len(ring)
+    keep[0] = keep[far] = keep[-1] = True
+    stack = [(0, far), (far, len(ring) - 1)]
+    while stack:
+        first, last = stack.pop()
+        best, best_dist = None, tolerance
+        for i in range(first + 1, last):
+            dist = _segment_distance(ring[i], ring[first], ring[last])
+            if dist > best_dist:
+                best, best_dist = i, dist
+        if best is not None:
+            keep[best] = True
+            stack.append((first, best))
+            stack.append((best, last))
+
+    simplified = [pt for pt, kept in zip(ring, keep) if kept]
+    if len(simplified) < 4:
+        return poly
+    return simplified
+
+
+def simplify_polygons(polygons, tolerance):
+    return [simplify_polygon(poly, tolerance) for poly in polygons]
+
+
+def _poly_boxes(polygons):
+    boxes = []
+    for poly in polygons:
+        xs = [p[0] for p in poly]
+        ys = [p[1] for p in poly]
+        boxes.append((min(xs), min(ys), max(xs), max(ys), poly))
+    return boxes
+
+
+def _clip_cell(x, y, template, edge_grid, scanlines, point_in_polys, draft=False):
+    # Clipped pieces of one boundary cell, still in the lattice frame. Straight
+    # runs along an axis are cheap to clip exactly; for previews, draft keeps
+    # other strokes whole when both their ends are inside and drops the rest.
+    pieces = []
+    for (sx0, sy0, sx1, sy1), axis in zip(template.segments, template.axes):
+        if axis == 0:
+            sx = x + sx0
+            spans, on_edge = scanlines.vertical(sx)
+            for ya, yb in _clip_to_spans(y + sy0, y + sy1, spans):
+                if not on_edge or point_in_polys((sx, (ya + yb) * 0.5)):
+                    pieces.append(((sx, ya), (sx, yb)))
+        elif axis == 1:
+            sy = y + sy0
+            spans, on_edge = scanlines.horizontal(sy)
+            for xa, xb in _clip_to_spans(x + sx0, x + sx1, spans):
+                if not on_edge or point_in_polys(((xa + xb) * 0.5, sy)):
+                    pieces.append(((xa, sy), (xb, sy)))
+        elif draft:
+            a = (x + sx0, y + sy0)
+            b = (x + sx1, y + sy1)
+            if point_in_polys(a) and point_in_polys(b):
+                pieces.append((a, b))
+        else:
+            pieces.extend(_clip_segment(
+                (x + sx0, y + sy0), (x + sx1, y + sy1), edge_grid, point_in_polys
+            ))
+    for ctrl in template.curves:
+        pts = [(x + px, y + py) for px, py in ctrl]
+        if not draft:
+            pieces.extend(_clip_curve(pts, edge_grid, point_in_polys))
+        elif point_in_polys(pts[0]) and point_in_polys(pts[-1]):
+            pieces.append(Bezier(pts))
+    return pieces
+
+
+def _rotate_polygons(polygons, angle_rad):
+    # Rotate the outline by -angle about its bounding-box centre so the
+    # lattice can be laid out axis-aligned.
+    all_x = [p[0] for poly in polygons for p in poly]
+    all_y = [p[1] for poly in polygons for p in poly]
+    cx = (min(all_x) + max(all_x)) / 2.0
+    cy = (min(all_y) + max(all_y)) / 2.0
+
+    cos_neg = math.cos(-angle_rad)
+    sin_neg = math.sin(-angle_rad)
+    polygons_rot = [
+        [
+            (cx + (x - cx) * cos_neg - (y - cy) * sin_neg,
+             cy + (x - cx) * sin_neg + (y - cy) * cos_neg)
+            for x, y in poly
+        ]
+        for poly in polygons
+    ]
+
+    all_x = [p[0] for poly in polygons_rot for p in poly]
+    all_y = [p[1] for poly in polygons_rot for p in poly]
+    bounds = (min(all_x), min(all_y), max(all_x), max(all_y))
+    return cx, cy, polygons_rot, bounds
+
+
+def _lattice_steps(start, limit, step):
+    # Accumulate rather than multiply so every caller lands on the same floats.
+    values = []
+    value = start
+    while value <= limit:
+        values.append(value)
+        value += step
+    return values
+
+
+def _row_window(rows, row_window):
+    if row_window is None:
+        return rows
+    lo, hi = row_window
+    return tuple(ys[bisect_left(ys, lo):bisect_left(ys, hi)] for ys in rows)
+
+
+def lattice_column_count(polygons, width, x_spacing, angle_rad=0.0):
+    cell_width = width + x_spacing
+    if not polygons or cell_width <= 0:
+        return 0
+    _, _, _, (min_x, _, max_x, _) = _rotate_polygons(polygons, angle_rad)
+    return len(_lattice_steps(min_x - cell_width, max_x + cell_width + 0.001, cell_width))
+
+
+class PreparedOutline:
+    # An outline simplified and rotated for one angle, with its containment
+    # and edge indexes built on first use. Pass it as prepared= to generate
+    # many variants (spacing, size, pattern) without redoing that work; the
+    # engine's simplify argument is then ignored.
+
+    def __init__(self, polygons, angle_rad=0.0, simplify=None):
+        if simplify:
+            polygons = simplify_polygons(polygons, simplify)
+        self.polygons = polygons
+        self.angle_rad = angle_rad
+        self.frame = _rotate_polygons(polygons, angle_rad)
+        self._cos = math.cos(angle_rad)
+        self._sin = math.sin(angle_rad)
+        self._python = None
+        # Engine-specific arrays, filled in by the NumPy backend.
+        self.arrays = {}
+
+    def to_document(self, pt):
+        # A frame_space output point in document coordinates.
+        cx, cy = self.frame[0], self.frame[1]
+        dx = pt[0] - cx
+        dy = pt[1] - cy
+        return (cx + dx * self._cos - dy * self._sin, cy + dx * self._sin + dy * self._cos)
+
+    def to_frame(self, pt):
+        cx, cy = self.frame[0], self.frame[1]
+        dx = pt[0] - cx
+        dy = pt[1] - cy
+        return (cx + dx * self._cos + dy * self._sin, cy - dx * self._sin + dy * self._cos)
+
+    def python_index(self):
+        # (slabs, poly_boxes, edge_grid, scanlines) for the Python engine.
+        # Scanline intervals cached by one variant are reused by the next.
+        if self._python is None:
+            polygons_rot = self.frame[2]
+            edge_grid = _EdgeGrid(polygons_rot)
+            self._python = (
+                _Slabs(polygons_rot), _poly_boxes(polygons_rot), edge_grid, _Scanlines(edge_grid)
+            )
+        return self._python
+
+
+def _clip_ring(poly, axis, value, keep_above):
+    # Cut a ring down to an axis-aligned half-plane without moving any edge
+    # that reaches it: each run of outside vertices is replaced by one chord
+    # between its two ends. The chord stays outside (the half-plane is
+    # convex), so containment of every point inside is exactly as before.
+    pts = poly[:-1] if poly[0] == poly[-1] else poly
+    inside = [p[axis] >= value if keep_above else p[axis] <= value for p in pts]
+    n = len(pts)
+    out = [
+        p for i, p in enumerate(pts)
+        if inside[i] or inside[i - 1] or inside[(i + 1) % n]
+    ]
+    if len(out) < 3:
+        return None
+    out.append(out[0])
+    return out
+
+
+def _clip_polygons(polygons, axis, lo, hi):
+    clipped = []
+    for poly in polygons:
+        for value, keep_above in ((lo, True), (hi, False)):
+            if poly is not None and math.isfinite(value):
+                poly = _clip_ring(poly, axis, value, keep_above)
+        if poly is not None:
+            clipped.append(poly)
+    return clipped
+
+
+def _iter_tiles(polygons, shape_fn, height, width, x_spacing, y_spacing, y_offset,
+                angle_rad, tile_size, column_range, kwargs):
+    # Tiles are whole lattice cells: a run of columns by a run of rows,
+    # with rows assigned by their y so odd (staggered) columns split at the
+    # same heights. Each tile clips the rotated outline to a margin around
+    # its cells and runs the engine on that alone, so the outline indexes
+    # stay tile-sized and are dropped before the next tile.
+    cell_width = width + x_spacing
+    cell_height = height + y_spacing
+    if cell_width <= 0 or cell_height <= 0:
+        raise ValueError("Cell dimensions must be positive")
+    if kwargs.get("simplify"):
+        polygons = simplify_polygons(polygons, kwargs["simplify"])
+    kwargs = dict(kwargs, simplify=None)
+
+    cx, cy, polygons_rot, bounds = _rotate_polygons(polygons, angle_rad)
+    min_x, min_y, max_x, max_y = bounds
+    template = compile_template(
+        shape_fn, height, width, kwargs.get("shape_kwargs"),
+        kwargs.get("tolerance"), kwargs.get("curves", False),
+    )
+    if template.box is None:
+        return
+    bx0, by0, bx1, by1 = template.box
+    columns = _lattice_steps(min_x - cell_width, max_x + cell_width + 0.001, cell_width)
+    rows = _lattice_steps(min_y - cell_height, max_y + cell_height + 0.001, cell_height)
+    tile_cols = max(1, int(round(tile_size / cell_width)))
+    tile_rows = max(1, int(round(tile_size / cell_height)))
+    cuts = [-math.inf] + rows[tile_rows::tile_rows] + [math.inf]
+    margin = max(cell_width, cell_height)
+
+    col_start, col_stop = column_range or (0, len(columns))
+    col_stop = min(col_stop, len(columns))
+    for c0 in range(col_start, col_stop, tile_cols):
+        c1 = min(c0 + tile_cols, col_stop)
+        strip = _clip_polygons(
+            polygons_rot, 0, columns[c0] + bx0 - margin, columns[c1 - 1] + bx1 + margin
+        )
+        for y_lo, y_hi in zip(cuts, cuts[1:]):
+            tile = _clip_polygons(
+                strip, 1, y_lo + by0 - margin, y_hi + by1 + margin
+            )
+            if not tile:
+                continue
+            yield from iter_hinge(
+                tile, shape_fn, height, width, x_spacing, y_spacing, y_offset,
+                angle_rad=angle_rad, column_range=(c0, c1),
+                frame=(cx, cy, tile, bounds), row_window=(y_lo, y_hi), **kwargs
+            )
+
+
+def iter_hinge(
     polygons,
     shape_fn,
     height,
@@ -124,11 +942,59 @@ def generate_hinge(
     y_offset,
     angle_rad=0.0,
     shape_kwargs=None,
+    backend="python",
+    column_range=None,
+    profile=None,
+    tolerance=None,
+    simplify=None,
+    curves=False,
+    draft=False,
+    frame_space=False,
+    tile_size=None,
+    prepared=None,
+    frame=None,
+    row_window=None,
 ):
+    # prepared is a PreparedOutline of these polygons at angle_rad. draft
+    # clips only axis-aligned strokes of cells that cross the outline and
+    # keeps or drops the rest whole, for quick previews. frame and
+    # row_window are for _iter_tiles: an already rotated outline with the
+    # full sheet's rotation centre and bounds, and the [lo, hi) band of
+    # lattice row positions to generate.
+    if tile_size and frame is None:
+        return _iter_tiles(
+            polygons, shape_fn, height, width, x_spacing, y_spacing, y_offset,
+            angle_rad, tile_size, column_range,
+            dict(shape_kwargs=shape_kwargs, backend=backend, profile=profile,
+                 tolerance=tolerance, simplify=simplify, curves=curves, draft=draft,
+                 frame_space=frame_space),
+        ) if polygons else iter(())
+
+    # Curves, or a missing NumPy, quietly fall back to the Python engine;
+    # callers warn once per job through livinghinge_job.engine_backend.
+    if backend == "numpy" and not curves:
+        try:
+            from livinghinge_numpy import iter_hinge_numpy
+        except ImportError:
+            pass
+        else:
+            return iter_hinge_numpy(
+                polygons, shape_fn, height, width, x_spacing, y_spacing,
+                y_offset, angle_rad=angle_rad, shape_kwargs=shape_kwargs,
+                column_range=column_range, profile=profile, tolerance=tolerance,
+                simplify=simplify, draft=draft, frame_space=frame_space,
+                prepared=prepared, frame=frame, row_window=row_window,
+            )
+
     if not polygons:
-        return []
+        return iter(())
+
+    if profile is not None:
+        prepare_start = perf_counter()
 
     shape_kwargs = shape_kwargs or {}
+    if simplify and prepared is None:
+        polygons = simplify_polygons(polygons, simplify)
 
     cell_width = width + x_spacing
     cell_height = height + y_spacing
@@ -136,13 +1002,11 @@ def generate_hinge(
     if cell_width <= 0 or cell_height <= 0:
         raise ValueError("Cell dimensions must be positive")
 
-    all_x = [p[0] for poly in polygons for p in poly]
-    all_y = [p[1] for poly in polygons for p in poly]
-    min_x, max_x = min(all_x), max(all_x)
-    min_y, max_y = min(all_y), max(all_y)
-
-    cx = (min_x + max_x) / 2.0
-    cy = (min_y + max_y) / 2.0
+    if prepared is not None:
+        frame = prepared.frame
+    cx, cy, polygons_rot, (min_x, min_y, max_x, max_y) = (
+        frame or _rotate_polygons(polygons, angle_rad)
+    )
 
     cos_a = math.cos(angle_rad)
     sin_a = math.sin(angle_rad)
@@ -156,76 +1020,287 @@ def generate_hinge(
             cy + dx * sin_v + dy * cos_v,
         )
 
-    cos_neg = math.cos(-angle_rad)
-    sin_neg = math.sin(-angle_rad)
-    polygons_rot = [
-        [rotate_point(p, cos_neg, sin_neg) for p in poly]
-        for poly in polygons
-    ]
+    pip_calls = [0]
 
-    all_x = [p[0] for poly in polygons_rot for p in poly]
-    all_y = [p[1] for poly in polygons_rot for p in poly]
-    min_x, max_x = min(all_x), max(all_x)
-    min_y, max_y = min(all_y), max(all_y)
+    # Per-polygon boxes: a point outside a box cannot be inside that polygon,
+    # which spares the ray test for every small hole away from it.
+    if prepared is not None:
+        slabs, poly_boxes, edge_grid, scanlines = prepared.python_index()
+    else:
+        slabs = _Slabs(polygons_rot)
+        poly_boxes = _poly_boxes(polygons_rot)
+        edge_grid = _EdgeGrid(polygons_rot)
+        scanlines = _Scanlines(edge_grid)
 
     def point_in_polys(pt):
-        for poly in polygons_rot:
-            if _point_in_poly(pt[0], pt[1], poly):
+        px, py = pt
+        if slabs.ok:
+            return slabs.contains(px, py)
+        for bx0, by0, bx1, by1, poly in poly_boxes:
+            if px < bx0 or px > bx1 or py < by0 or py > by1:
+                continue
+            if _point_in_poly(px, py, poly):
                 return True
         return False
 
-    shape_data = shape_fn(height, width, **shape_kwargs)
+    if profile is not None:
+        if edge_grid.tested is None:
+            edge_grid.tested = 0
+        tested_before = edge_grid.tested
+        contains = point_in_polys
+
+        def point_in_polys(pt):
+            pip_calls[0] += 1
+            return contains(pt)
+
+    template = compile_template(shape_fn, height, width, shape_kwargs, tolerance, curves)
+    if template.box is None:
+        return iter(())
+    pad = 1e-6
+    box_x0 = template.box[0] - pad
+    box_y0 = template.box[1] - pad
+    box_x1 = template.box[2] + pad
+    box_y1 = template.box[3] + pad
+
+    # Interior cells are a rigid copy of the template, so rotate its segment
+    # vectors once and only rotate each cell origin.
+    template_rot = [
+        (x0 * cos_a - y0 * sin_a, x0 * sin_a + y0 * cos_a,
+         x1 * cos_a - y1 * sin_a, x1 * sin_a + y1 * cos_a)
+        for x0, y0, x1, y1 in template.segments
+    ]
+    curves_rot = [
+        [(px * cos_a - py * sin_a, px * sin_a + py * cos_a) for px, py in ctrl]
+        for ctrl in template.curves
+    ]
+    columns = _lattice_steps(min_x - cell_width, max_x + cell_width + 0.001, cell_width)
+    rows = (
+        _lattice_steps(min_y - cell_height, max_y + cell_height + 0.001, cell_height),
+        _lattice_steps(min_y - cell_height + y_offset, max_y + cell_height + 0.001, cell_height),
+    )
+
+    # Column parity alone decides the stagger, so any slice of columns can be
+    # generated on its own and concatenated back in order.
+    col_start, col_stop = column_range or (0, len(columns))
+    rows = _row_window(rows, row_window)
+
+    if profile is not None:
+        profile.add_time("prepare", perf_counter() - prepare_start)
+
+    def cells():
+        timing = profile is not None
+        clock = perf_counter
+        times = {"classify": 0.0, "interior": 0.0, "clip": 0.0, "rotate": 0.0}
+        counts = {"cells_visited": 0, "cells_interior": 0, "cells_boundary": 0,
+                  "segments_clipped": 0, "segments_out": 0}
+        try:
+            for col_index in range(col_start, min(col_stop, len(columns))):
+                x = columns[col_index]
+                for y in rows[col_index % 2]:
+                    if timing:
+                        counts["cells_visited"] += 1
+                        t0 = clock()
+                    cell_box = (x + box_x0, y + box_y0, x + box_x1, y + box_y1)
+                    cell_state = _classify_cell(cell_box, edge_grid, point_in_polys)
+                    if timing:
+                        t1 = clock()
+                        times["classify"] += t1 - t0
+                    if cell_state == _CELL_EXTERIOR:
+                        continue
+
+                    shape_segments = []
+                    if cell_state == _CELL_INTERIOR and frame_space:
+                        shape_segments = TemplateCell(
+                            [
+                                Bezier((x + px, y + py) for px, py in stroke)
+                                if isinstance(stroke, Bezier)
+                                else [(x + px, y + py) for px, py in stroke]
+                                for stroke in template.strokes
+                            ],
+                            (x, y),
+                            template.strokes,
+                        )
+                        if timing:
+                            counts["cells_interior"] += 1
+                            times["interior"] += clock() - t1
+                    elif cell_state == _CELL_INTERIOR:
+                        ox, oy = rotate_point((x, y), cos_a, sin_a)
+                        for dx0, dy0, dx1, dy1 in template_rot:
+                            shape_segments.append([(ox + dx0, oy + dy0), (ox + dx1, oy + dy1)])
+                        for ctrl in curves_rot:
+                            shape_segments.append(Bezier((ox + px, oy + py) for px, py in ctrl))
+                        if timing:
+                            counts["cells_interior"] += 1
+                            times["interior"] += clock() - t1
+                    else:
+                        pieces = _clip_cell(
+                            x, y, template, edge_grid, scanlines, point_in_polys, draft
+                        )
+                        if timing:
+                            t2 = clock()
+                            times["clip"] += t2 - t1
+                            counts["cells_boundary"] += 1
+                            counts["segments_clipped"] += (
+                                len(template.segments) + len(template.curves)
+                            )
+                        if frame_space:
+                            shape_segments = pieces
+                        else:
+                            for piece in pieces:
+                                rotated = [rotate_point(pt, cos_a, sin_a) for pt in piece]
+                                shape_segments.append(
+                                    Bezier(rotated) if isinstance(piece, Bezier) else rotated
+                                )
+                        if timing:
+                            times["rotate"] += clock() - t2
+                    if shape_segments:
+                        if timing:
+                            counts["segments_out"] += len(shape_segments)
+                        yield shape_segments
+        finally:
+            if timing:
+                for name, seconds in times.items():
+                    profile.add_time(name, seconds)
+                for name, n in counts.items():
+                    profile.count(name, n)
+                profile.count("edge_tests", edge_grid.tested - tested_before)
+                profile.count("point_in_poly_calls", pip_calls[0])
+
+    return cells()
 
-    result_polylines = []
 
-    start_x = min_x - cell_width
-    start_y = min_y - cell_height
+def generate_hinge(*args, **kwargs):
+    return list(iter_hinge(*args, **kwargs))
 
-    x = start_x
-    col_index = 0
 
-    while x <= max_x + cell_width + 0.001:
-        col_y_offset = y_offset if col_index % 2 == 1 else 0.0
-        y = start_y + col_y_offset
+def _snap(pt, tolerance):
+    return (round(pt[0] / tolerance), round(pt[1] / tolerance))
 
-        while y <= max_y + cell_height + 0.001:
-            polylines = _expand_shape_to_points(shape_data, x, y, width, height)
 
-            shape_segments = []
-            for polyline in polylines:
-                for i in range(len(polyline) - 1):
-                    p0 = polyline[i]
-                    p1 = polyline[i + 1]
-                    clipped = _clip_segment(p0, p1, polygons_rot, point_in_polys)
-                    for seg_start, seg_end in clipped:
-                        ra = rotate_point(seg_start, cos_a, sin_a)
-                        rb = rotate_point(seg_end, cos_a, sin_a)
-                        shape_segments.append([ra, rb])
-            if shape_segments:
-                result_polylines.append(shape_segments)
+def _merge_collinear(points, tolerance):
+    merged = [points[0]]
+    for i in range(1, len(points) - 1):
+        ax, ay = merged[-1]
+        bx, by = points[i]
+        cx, cy = points[i + 1]
+        ux, uy = cx - ax, cy - ay
+        cross = (bx - ax) * uy - (by - ay) * ux
+        dot = (bx - ax) * (cx - bx) + (by - ay) * (cy - by)
+        if dot >= 0 and abs(cross) <= tolerance * math.hypot(ux, uy):
+            continue
+        merged.append(points[i])
+    merged.append(points[-1])
+    return merged
 
-            y += cell_height
-        col_index += 1
-        x += cell_width
 
-    return result_polylines
+def stitch_segments(segments, tolerance=1e-6):
+    # Chain polylines whose endpoints meet (reversing where needed), then
+    # drop the interior points of straight runs. Curve strokes are passed
+    # through after them, in their own order.
+    chains = [list(seg) for seg in segments if len(seg) >= 2 and not isinstance(seg, Bezier)]
+    curves = [seg for seg in segments if isinstance(seg, Bezier)]
+    starts = {}
+    ends = {}
+    for index, chain in enumerate(chains):
+        starts.setdefault(_snap(chain[0], tolerance), []).append(index)
+        ends.setdefault(_snap(chain[-1], tolerance), []).append(index)
+    alive = [True] * len(chains)
 
+    def take(table, key, skip):
+        for index in table.get(key, ()):
+            if alive[index] and index != skip:
+                alive[index] = False
+                return index
+        return None
 
-def segments_to_svg_paths(polylines, stroke_style, group):
-    for segments in polylines:
-        if not segments:
+    stitched = []
+    for index, chain in enumerate(chains):
+        if not alive[index]:
             continue
+        alive[index] = False
+        while _snap(chain[-1], tolerance) != _snap(chain[0], tolerance):
+            key = _snap(chain[-1], tolerance)
+            nxt = take(starts, key, index)
+            if nxt is not None:
+                chain.extend(chains[nxt][1:])
+                continue
+            nxt = take(ends, key, index)
+            if nxt is None:
+                break
+            chain.extend(reversed(chains[nxt][:-1]))
+        while _snap(chain[-1], tolerance) != _snap(chain[0], tolerance):
+            key = _snap(chain[0], tolerance)
+            prev = take(ends, key, index)
+            if prev is not None:
+                chain[:0] = chains[prev][:-1]
+                continue
+            prev = take(starts, key, index)
+            if prev is None:
+                break
+            chain[:0] = reversed(chains[prev][1:])
+        stitched.append(_merge_collinear(chain, tolerance))
+    return stitched + curves
+
+
+def stitch_cells(cells, tolerance=1e-6):
+    # Template cells pass through untouched; emitters stitch the shared
+    # template once instead.
+    for segments in cells:
+        if isinstance(segments, TemplateCell):
+            yield segments
+        else:
+            yield stitch_segments(segments, tolerance)
 
-        d_parts = []
-        for segment in segments:
-            if len(segment) < 2:
+
+def _formatter(precision):
+    # Fixed decimals without trailing zeros; None keeps full float precision.
+    if precision is None:
+        return str
+
+    def fmt(value):
+        text = f"{value:.{precision}f}"
+        if "." in text:
+            text = text.rstrip("0").rstrip(".")
+        return "0" if text == "-0" else text
+    return fmt
+
+
+def iter_path_data(polylines, profile=None, precision=None):
+    # One path "d" string per cell, built as the cells arrive so a streamed
+    # hinge never has to exist in memory all at once. precision rounds the
+    # coordinates to that many decimals.
+    packed = getattr(polylines, "iter_path_data", None)
+    if packed is not None:
+        yield from packed(profile, precision)
+        return
+    num = _formatter(precision)
+    commands = 0
+    try:
+        for segments in polylines:
+            if not segments:
                 continue
-            d_parts.append(f"M {segment[0][0]},{segment[0][1]}")
-            for pt in segment[1:]:
-                d_parts.append(f"L {pt[0]},{pt[1]}")
-
-        if d_parts:
-            path = inkex.PathElement()
-            path.style = stroke_style
-            path.set("d", " ".join(d_parts))
-            group.add(path)
+
+            d_parts = []
+            pen = None
+            for segment in segments:
+                if len(segment) < 2:
+                    continue
+                if isinstance(segment, Bezier):
+                    # Curves that continue from the last point skip the move.
+                    if segment[0] != pen:
+                        d_parts.append(f"M {num(segment[0][0])},{num(segment[0][1])}")
+                    command = "C" if len(segment) == 4 else "Q"
+                    d_parts.append(command + "".join(f" {num(x)},{num(y)}" for x, y in segment[1:]))
+                    pen = segment[-1]
+                    continue
+                d_parts.append(f"M {num(segment[0][0])},{num(segment[0][1])}")
+                for pt in segment[1:]:
+                    d_parts.append(f"L {num(pt[0])},{num(pt[1])}")
+                pen = segment[-1]
+
+            if d_parts:
+                commands += len(d_parts)
+                yield " ".join(d_parts)
+    finally:
+        if profile is not None:
+            profile.count("output_commands", commands)
@@ -0,0 +1,211 @@
+# Living Hinge result cache
+# - Keeps a job's finished cells on disk, so running the same job again
+#   skips clipping, dedupe and stitching and goes straight to output
+# - Entries are named by a hash of the flattened outlines and the resolved
+#   hinge arguments, and hold one CompactCells per shape as raw bytes
+# - The directory is stamped with a hash of the engine sources; when they
+#   change, every entry is dropped
+# - Least recently used entries go first once the directory is over size
+
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from itertools import chain
+
+from livinghinge_compact import CompactCells
+
+# Modules whose code decides the cells; editing any of them empties caches.
+ENGINE_MODULES = (
+    "livinghinge.py", "livinghinge_numpy.py", "livinghinge_dedup.py",
+    "livinghinge_compact.py", "livinghinge_job.py", "shapes.py",
+)
+
+_SUFFIX = ".cells"
+_TEMP_SUFFIX = ".tmp"
+# Temporary files older than this (seconds) are from writes that crashed;
+# younger ones may belong to a run still writing.
+_STALE_TEMP = 3600
+# Shape count, then the byte length of each shape's cells.
+_COUNT = "<Q"
+_VERSION_FILE = "VERSION"
+_engine_version = None
+
+
+def engine_version():
+    global _engine_version
+    if _engine_version is None:
+        here = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.sha1(sys.byteorder.encode())
+        for name in ENGINE_MODULES:
+            try:
+                with open(os.path.join(here, name), "rb") as source:
+                    digest.update(source.read())
+            except OSError:
+                digest.update(b"missing")
+            digest.update(name.encode())
+        _engine_version = digest.hexdigest()[:16]
+    return _engine_version
+
+
+def cache_key(shape_polygons, hinge_args, stitch):
+    # hinge_args as from hinge_arguments. Dedupe works across shapes, so the
+    # key covers the whole job.
+    params = {
+        key: getattr(value, "__name__", value)
+        for key, value in hinge_args.items()
+        if key != "backend"
+    }
+    params["stitch"] = bool(stitch)
+    digest = hashlib.sha1(repr(sorted(params.items())).encode())
+    for polygons in shape_polygons:
+        for poly in polygons:
+            digest.update(array("d", chain.from_iterable(poly)).tobytes())
+            digest.update(b"|")
+        digest.update(b"#")
+    return digest.hexdigest()
+
+
+class ResultCache:
+    # max_bytes bounds the total size of the entries; None means no bound.
+
+    def __init__(self, directory, max_bytes=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        stamp = os.path.join(directory, _VERSION_FILE)
+        try:
+            with open(stamp) as f:
+                current = f.read().strip()
+        except OSError:
+            current = None
+        if current != engine_version():
+            self.clear()
+            self._write(stamp, engine_version().encode())
+        else:
+            self._remove_stale_temps()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def _entries(self, suffixes=(_SUFFIX,)):
+        try:
+            with os.scandir(self.directory) as it:
+                return [entry for entry in it if entry.name.endswith(suffixes)]
+        except OSError:
+            return []
+
+    def _write(self, path, data):
+        # Through a temporary file, so parallel runs never read half an entry.
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=_TEMP_SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+    def clear(self):
+        # Also removes temporary files left by a write that never finished.
+        for entry in self._entries((_SUFFIX, _TEMP_SUFFIX)):
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+
+    def _remove_stale_temps(self):
+        cutoff = time.time() - _STALE_TEMP
+        for entry in self._entries((_TEMP_SUFFIX,)):
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+            except OSError:
+                pass
+
+    def get(self, key):
+        # One CompactCells per shape, or None. A hit counts as a use for LRU.
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            streams = _unpack(data)
+        except (OSError, ValueError, struct.error):
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return streams
+
+    def put(self, key, streams):
+        self._write(self._path(key), _pack(streams))
+        self._evict()
+
+    def _evict(self):
+        if self.max_bytes is None:
+            return
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            total -= size
+
+    def storing(self, key, streams):
+        # Passes the streams through and stores them once the last one runs
+        # out; a job abandoned part way is not stored.
+        streams = list(streams)
+        packed = [CompactCells() for _ in streams]
+        finished = [0]
+
+        def store(cells, out):
+            for cell in cells:
+                out.append(cell)
+                yield cell
+            finished[0] += 1
+            if finished[0] == len(streams):
+                self.put(key, packed)
+
+        return [store(cells, out) for cells, out in zip(streams, packed)]
+
+
+def _pack(streams):
+    blobs = [cells.tobytes() for cells in streams]
+    header = struct.pack(_COUNT, len(blobs)) + b"".join(
+        struct.pack(_COUNT, len(blob)) for blob in blobs
+    )
+    return header + b"".join(blobs)
+
+
+def _unpack(data):
+    (count,) = struct.unpack_from(_COUNT, data)
+    size = struct.calcsize(_COUNT)
+    lengths = struct.unpack_from("<%dQ" % count, data, size)
+    offset = size * (count + 1)
+    streams = []
+    for length in lengths:
+        streams.append(CompactCells.frombytes(data[offset:offset + length]))
+        offset += length
+    if offset != len(data):
+        raise ValueError("malformed cache entry")
+    return streams
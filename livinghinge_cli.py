@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# Living Hinge batch CLI
+# - Fills many SVG or polygon JSON files in one process, no Inkscape needed
+# - Files run in a worker pool; each worker keeps its compiled templates
+#
+#   python livinghinge_cli.py --type bezier --bezier_width 4 -o out/ panels/*.svg
+#
+# JSON input is either a list of polygons (one shape) or
+# {"shapes": [[polygon, ...], ...]}, with polygons as [[x, y], ...] in --units.
+# Output strokes are point lists, or {"C": [...]} / {"Q": [...]} control points
+# with --curves. --export dxf|svg writes a DXF or bare SVG file of the hinge
+# instead. --sweep lays the same shapes out once per combination of option
+# values, as a DXF or SVG sheet of test coupons. SVG input needs the inkex
+# package (not Inkscape itself); without --id every shape in the document is
+# filled.
+
+import argparse
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+from livinghinge import Bezier
+from livinghinge_export import export_cells
+from livinghinge_sweep import parse_sweep, run_sweep, sheet_layout
+from livinghinge_job import (
+    add_hinge_arguments,
+    engine_backend,
+    final_quality,
+    hinge_arguments,
+    new_profile,
+    profile_phase,
+    polygons_bbox,
+    run_hinge_job,
+)
+
+
+def _close(poly):
+    poly = [(float(x), float(y)) for x, y in poly]
+    if poly and poly[0] != poly[-1]:
+        poly.append(poly[0])
+    return poly
+
+
+def _stroke_json(stroke):
+    points = [list(pt) for pt in stroke]
+    if isinstance(stroke, Bezier):
+        return {"C" if len(points) == 4 else "Q": points}
+    return points
+
+
+def load_polygon_json(path):
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    shapes = data["shapes"] if isinstance(data, dict) else [data]
+    shape_polygons = []
+    for shape in shapes:
+        polygons = [_close(poly) for poly in shape if len(poly) >= 3]
+        if polygons:
+            shape_polygons.append(polygons)
+    return shape_polygons
+
+
+def _output_path(path, opts, ext):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    out_dir = opts.output or os.path.dirname(path) or "."
+    return os.path.join(out_dir, f"{stem}{opts.suffix}{ext}")
+
+
+def _write_profile(profile, out_path, opts):
+    if profile is None:
+        return
+    if opts.profile == "json":
+        profile.write(os.path.splitext(out_path)[0] + ".profile.json")
+    else:
+        print(f"{out_path}:", file=sys.stderr)
+        profile.write()
+
+
+def _job_note(report):
+    notes = []
+    deduper = report.get("dedupe")
+    if deduper is not None and deduper.removed:
+        notes.append(f"duplicate cuts removed {deduper.removed:.1f}")
+    if "travel" in report:
+        notes.append("cut order travel {:.1f} -> {:.1f}".format(*report["travel"]))
+    cache = report.get("cache")
+    if cache is not None and cache.hits:
+        notes.append("from cache")
+    return ", ".join(notes) or None
+
+
+def process_json(path, opts):
+    if opts.export != "document":
+        opts = final_quality(opts)
+    profile = new_profile(opts)
+    shape_polygons = load_polygon_json(path)
+    if not shape_polygons:
+        raise ValueError("no polygons with at least three points")
+    hinge_args = hinge_arguments(
+        opts, polygons_bbox(shape_polygons), float, math.radians(opts.angle)
+    )
+    results, report = run_hinge_job(shape_polygons, hinge_args, opts, profile)
+    if opts.export != "document":
+        out_path = _output_path(path, opts, f".{opts.export}")
+        with profile_phase(profile, "write"):
+            count = export_cells(
+                out_path, opts.export, chain.from_iterable(results), polygons_bbox(shape_polygons),
+                unit=opts.units, precision=opts.precision,
+            )
+        _write_profile(profile, out_path, opts)
+        return out_path, count, _job_note(report)
+
+    cells = [[_stroke_json(stroke) for stroke in cell] for stream in results for cell in stream]
+    out_path = _output_path(path, opts, ".json")
+    if profile is not None:
+        profile.count("output_commands", sum(
+            len(stroke) if isinstance(stroke, list) else 2 for cell in cells for stroke in cell
+        ))
+    with profile_phase(profile, "write"):
+        with open(out_path, "w", encoding="utf-8") as fh:
+            json.dump({"units": opts.units, "cells": cells}, fh)
+    _write_profile(profile, out_path, opts)
+    return out_path, len(cells), _job_note(report)
+
+
+def _load_svg_shapes(path, opts):
+    import inkex
+    from km_living_hinge import collect_shapes
+
+    document = inkex.load_svg(path)
+    svg = document.getroot()
+    if opts.id:
+        elems = [svg.getElementById(elem_id) for elem_id in opts.id]
+        elems = [elem for elem in elems if elem is not None]
+    else:
+        elems = [svg]
+    shapes_to_process = [
+        shape for shape in collect_shapes(elems)
+        if not any(isinstance(parent, inkex.Defs) for parent in shape.ancestors())
+    ]
+    if not shapes_to_process:
+        raise ValueError("no shapes to fill")
+    return document, svg, shapes_to_process
+
+
+def process_svg(path, opts):
+    from km_living_hinge import add_hinge, export_hinge
+
+    document, svg, shapes_to_process = _load_svg_shapes(path, opts)
+    profile = new_profile(opts)
+    messages = []
+    if opts.export != "document":
+        out_path = _output_path(path, opts, f".{opts.export}")
+        count = export_hinge(svg, shapes_to_process, opts, out_path, messages.append, profile)
+        _write_profile(profile, out_path, opts)
+        return out_path, count, "; ".join(messages) or None
+
+    group = add_hinge(svg, shapes_to_process, opts, messages.append, profile)
+    out_path = _output_path(path, opts, ".svg")
+    with profile_phase(profile, "write"):
+        document.write(out_path)
+    _write_profile(profile, out_path, opts)
+    return out_path, sum(len(shape_group) for shape_group in group), "; ".join(messages) or None
+
+
+def process_sweep(path, opts):
+    # One sheet file of coupons, one per combination of the --sweep values.
+    opts = final_quality(opts)
+    profile = new_profile(opts)
+    if path.lower().endswith(".json"):
+        shape_polygons = load_polygon_json(path)
+        if not shape_polygons:
+            raise ValueError("no polygons with at least three points")
+        unit = opts.units
+        to_uu = float
+        scale = 1.0
+    else:
+        from km_living_hinge import shape_polygons as flatten_shape
+
+        _, svg, shapes_to_process = _load_svg_shapes(path, opts)
+        shape_polygons = [p for p in map(flatten_shape, shapes_to_process) if p]
+        unit = "mm" if opts.units == "px" else opts.units
+
+        def to_uu(value):
+            return float(svg.unittouu(f"{value}{opts.units}"))
+
+        scale = svg.uutounit(1.0, unit)
+
+    runs = run_sweep(
+        shape_polygons, opts, parse_sweep(opts.sweep), to_uu,
+        gap=to_uu(opts.sweep_gap), profile=profile,
+    )
+    fmt = opts.export if opts.export != "document" else "svg"
+    out_path = _output_path(path, opts, f".sweep.{fmt}")
+    bbox = polygons_bbox(shape_polygons)
+    _, sheet = sheet_layout(len(runs), bbox, to_uu(opts.sweep_gap))
+    with profile_phase(profile, "write"):
+        cells = (cell for _, results, _, _ in runs for stream in results for cell in stream)
+        count = export_cells(
+            out_path, fmt, cells, sheet,
+            unit=unit, scale=scale, precision=opts.precision,
+        )
+    for index, (overrides, _, _, (dx, dy)) in enumerate(runs, 1):
+        params = " ".join(f"{name}={value:g}" for name, value in overrides.items())
+        print(f"{out_path}: coupon {index} at {dx * scale:g},{dy * scale:g}: {params}", file=sys.stderr)
+    _write_profile(profile, out_path, opts)
+    return out_path, count, f"{len(runs)} coupons"
+
+
+def process_file(path, opts):
+    try:
+        if opts.sweep:
+            return path, process_sweep(path, opts), None
+        if path.lower().endswith(".json"):
+            return path, process_json(path, opts), None
+        return path, process_svg(path, opts), None
+    except Exception as err:  # report and carry on with the rest of the batch
+        return path, None, f"{type(err).__name__}: {err}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate living hinges for many files.")
+    add_hinge_arguments(parser)
+    parser.add_argument("inputs", nargs="+", help="SVG or polygon JSON files")
+    parser.add_argument("-o", "--output", help="output directory (default: next to each input)")
+    parser.add_argument("--suffix", default=".hinge", help="added to each output file name")
+    parser.add_argument("--id", action="append", help="SVG element id to fill (repeatable)")
+    parser.add_argument("--sweep", action="append",
+                        help="option=v1,v2,... or option=start:stop:step; writes one sheet "
+                             "of test coupons, one per combination (repeatable)")
+    parser.add_argument("--sweep_gap", type=float, default=5.0,
+                        help="space between sweep coupons, in --units")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="files processed in parallel")
+    opts = parser.parse_args(argv)
+    # Settled once for the whole batch, so a fallback is reported once.
+    opts.backend = engine_backend(opts, lambda note: print(note, file=sys.stderr))
+
+    if opts.output:
+        os.makedirs(opts.output, exist_ok=True)
+
+    if opts.jobs > 1 and len(opts.inputs) > 1:
+        with ProcessPoolExecutor(max_workers=opts.jobs) as pool:
+            outcomes = list(pool.map(process_file, opts.inputs, [opts] * len(opts.inputs)))
+    else:
+        outcomes = [process_file(path, opts) for path in opts.inputs]
+
+    failures = 0
+    for path, result, error in outcomes:
+        if error:
+            failures += 1
+            print(f"{path}: {error}", file=sys.stderr)
+            continue
+        out_path, count, note = result
+        line = f"{path} -> {out_path} ({count} paths)"
+        print(f"{line} {note}" if note else line, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
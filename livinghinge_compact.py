@@ -0,0 +1,167 @@
+# Living Hinge compact geometry
+# - Hinge cells held in flat typed arrays instead of lists of point tuples
+# - About 16 bytes a point instead of well over 100, and nothing for the GC
+#   to walk; cells and strokes are rebuilt as tuples only when asked for
+
+import struct
+from array import array
+from itertools import chain
+
+from livinghinge import Bezier, _formatter, iter_hinge
+
+_POLYLINE = 0
+# Element counts of the four arrays in tobytes output.
+_HEADER = "<4Q"
+
+
+class CompactCells:
+    # Struct-of-arrays store: coords holds x, y pairs; point_starts has one
+    # entry per stroke (plus an end marker) indexing into the points;
+    # kinds is 0 for a polyline or the control point count of a Bezier;
+    # cell_starts indexes into the strokes the same way.
+    __slots__ = ("coords", "point_starts", "kinds", "cell_starts")
+
+    def __init__(self):
+        self.coords = array("d")
+        self.point_starts = array("q", [0])
+        self.kinds = array("b")
+        self.cell_starts = array("q", [0])
+
+    @classmethod
+    def from_cells(cls, cells):
+        packed = cls()
+        packed.extend(cells)
+        return packed
+
+    def append(self, cell):
+        coords = self.coords
+        point_starts = self.point_starts
+        kinds = self.kinds
+        for stroke in cell:
+            coords.extend(chain.from_iterable(stroke))
+            point_starts.append(len(coords) // 2)
+            kinds.append(len(stroke) if isinstance(stroke, Bezier) else _POLYLINE)
+        self.cell_starts.append(len(kinds))
+
+    def extend(self, cells):
+        if not isinstance(cells, CompactCells):
+            for cell in cells:
+                self.append(cell)
+            return
+        point_base = len(self.coords) // 2
+        stroke_base = len(self.kinds)
+        self.coords.extend(cells.coords)
+        self.point_starts.extend(start + point_base for start in cells.point_starts[1:])
+        self.kinds.extend(cells.kinds)
+        self.cell_starts.extend(start + stroke_base for start in cells.cell_starts[1:])
+
+    def __len__(self):
+        return len(self.cell_starts) - 1
+
+    def _stroke(self, index):
+        coords = self.coords
+        start = self.point_starts[index] * 2
+        stop = self.point_starts[index + 1] * 2
+        points = list(zip(coords[start:stop:2], coords[start + 1:stop:2]))
+        return Bezier(points) if self.kinds[index] else points
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("cell index out of range")
+        return [
+            self._stroke(k)
+            for k in range(self.cell_starts[index], self.cell_starts[index + 1])
+        ]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def stroke_count(self):
+        return len(self.kinds)
+
+    def point_count(self):
+        return len(self.coords) // 2
+
+    def _buffers(self):
+        return (self.coords, self.point_starts, self.kinds, self.cell_starts)
+
+    def nbytes(self):
+        return sum(buf.itemsize * len(buf) for buf in self._buffers())
+
+    def tobytes(self):
+        # The four arrays behind a header of their lengths, in native byte
+        # order.
+        buffers = self._buffers()
+        header = struct.pack(_HEADER, *(len(buf) for buf in buffers))
+        return header + b"".join(buf.tobytes() for buf in buffers)
+
+    @classmethod
+    def frombytes(cls, data):
+        packed = cls()
+        buffers = packed._buffers()
+        for buf in buffers:
+            del buf[:]
+        offset = struct.calcsize(_HEADER)
+        for buf, count in zip(buffers, struct.unpack_from(_HEADER, data)):
+            stop = offset + count * buf.itemsize
+            if stop > len(data):
+                raise ValueError("truncated cell data")
+            buf.frombytes(data[offset:stop])
+            offset = stop
+        if offset != len(data) or not packed.point_starts or not packed.cell_starts:
+            raise ValueError("malformed cell data")
+        return packed
+
+    def iter_path_data(self, profile=None, precision=None):
+        # Same strings as livinghinge.iter_path_data, read straight from the
+        # arrays.
+        num = _formatter(precision)
+        coords = self.coords
+        point_starts = self.point_starts
+        kinds = self.kinds
+        cell_starts = self.cell_starts
+        commands = 0
+        try:
+            for cell in range(len(self)):
+                d_parts = []
+                pen = None
+                for k in range(cell_starts[cell], cell_starts[cell + 1]):
+                    start = point_starts[k]
+                    stop = point_starts[k + 1]
+                    if stop - start < 2:
+                        continue
+                    x0 = coords[2 * start]
+                    y0 = coords[2 * start + 1]
+                    if kinds[k]:
+                        if (x0, y0) != pen:
+                            d_parts.append(f"M {num(x0)},{num(y0)}")
+                        command = "C" if kinds[k] == 4 else "Q"
+                        d_parts.append(command + "".join(
+                            f" {num(coords[2 * i])},{num(coords[2 * i + 1])}"
+                            for i in range(start + 1, stop)
+                        ))
+                    else:
+                        d_parts.append(f"M {num(x0)},{num(y0)}")
+                        for i in range(start + 1, stop):
+                            d_parts.append(f"L {num(coords[2 * i])},{num(coords[2 * i + 1])}")
+                    pen = (coords[2 * stop - 2], coords[2 * stop - 1])
+                if d_parts:
+                    commands += len(d_parts)
+                    yield " ".join(d_parts)
+        finally:
+            if profile is not None:
+                profile.count("output_commands", commands)
+
+
+def generate_hinge_compact(*args, **kwargs):
+    return CompactCells.from_cells(iter_hinge(*args, **kwargs))
+
+
+def pack_polygons(polygons):
+    # Outline polygons as a one-cell store; unpack with packed[0].
+    packed = CompactCells()
+    packed.append(polygons)
+    return packed
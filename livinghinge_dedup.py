@@ -0,0 +1,201 @@
+# Living Hinge duplicate cut removal
+# - Patterns with negative spacing overlap their neighbours, and overlapping
+#   selections fill the same area twice; both cut the same line twice
+# - Straight cuts are hashed by the line they lie on (angle and offset snapped
+#   to a grid), and each line keeps the stretches already cut, so repeated
+#   and overlapping segments are dropped or trimmed as the cells stream past
+# - Curves are dropped only when their snapped control points repeat
+# - Every distinct cut line of the job is remembered, so memory grows with
+#   the sheet even when generation streams; it is off unless --dedupe is set
+
+import math
+from bisect import bisect_left, bisect_right
+
+from livinghinge import Bezier, TemplateCell, _flatten_cubic, _flatten_quadratic, _snap
+
+# Angle bins over [0, pi); lookups also check the neighbouring bins, and
+# candidates are confirmed by distance, so this only sets the bucket size.
+_ANGLE_BINS = 1 << 16
+_ANGLE_STEP = math.pi / _ANGLE_BINS
+
+
+def _curve_length(ctrl, tolerance):
+    pts = [ctrl[0]]
+    if len(ctrl) == 4:
+        _flatten_cubic(ctrl[0], ctrl[1], ctrl[2], ctrl[3], tolerance, pts)
+    else:
+        _flatten_quadratic(ctrl[0], ctrl[1], ctrl[2], tolerance, pts)
+    return sum(math.dist(a, b) for a, b in zip(pts, pts[1:]))
+
+
+class _Line:
+    # A cut line: unit direction, signed offset from the origin and the
+    # sorted, disjoint [start, stop] stretches along it that are already cut.
+    __slots__ = ("ux", "uy", "offset", "starts", "stops")
+
+    def __init__(self, ux, uy, offset):
+        self.ux = ux
+        self.uy = uy
+        self.offset = offset
+        self.starts = []
+        self.stops = []
+
+    def distance(self, pt):
+        return abs(self.ux * pt[1] - self.uy * pt[0] - self.offset)
+
+    def position(self, pt):
+        return self.ux * pt[0] + self.uy * pt[1]
+
+    def cover(self, a, b, tolerance):
+        # Marks [a, b] as cut and returns the parts of it that were not.
+        starts, stops = self.starts, self.stops
+        i = bisect_left(stops, a - tolerance)
+        j = bisect_right(starts, b + tolerance)
+        free = []
+        pos = a
+        for k in range(i, j):
+            if starts[k] - pos > tolerance:
+                free.append((pos, min(starts[k], b)))
+            pos = max(pos, stops[k])
+        if b - pos > tolerance:
+            free.append((pos, b))
+        if i < j:
+            a = min(a, starts[i])
+            b = max(b, stops[j - 1])
+        starts[i:j] = [a]
+        stops[i:j] = [b]
+        return free
+
+
+class CutDeduper:
+    # Feed every stream through the same instance to deduplicate across
+    # shapes. The first cut along a stretch wins; removed is the total
+    # length dropped so far, in input units.
+
+    def __init__(self, tolerance):
+        self.tolerance = tolerance
+        self.lines = {}
+        self.curves = set()
+        self.removed = 0.0
+        self.segments = 0
+
+    def _find_line(self, p, q):
+        dx = q[0] - p[0]
+        dy = q[1] - p[1]
+        length = math.hypot(dx, dy)
+        ux, uy = dx / length, dy / length
+        if uy < 0 or (uy == 0 and ux < 0):
+            ux, uy = -ux, -uy
+        offset = ux * p[1] - uy * p[0]
+        angle_bin = int(round(math.atan2(uy, ux) / _ANGLE_STEP)) % _ANGLE_BINS
+        for da in (0, -1, 1):
+            # Stepping across the wrap at 0/pi flips the direction, and with
+            # it the sign of the offset.
+            key_angle = angle_bin + da
+            sign = 1
+            if key_angle < 0 or key_angle >= _ANGLE_BINS:
+                key_angle %= _ANGLE_BINS
+                sign = -1
+            home = round(sign * offset / self.tolerance)
+            for do in (0, -1, 1):
+                for line in self.lines.get((key_angle, home + do), ()):
+                    if line.distance(p) <= self.tolerance and line.distance(q) <= self.tolerance:
+                        return line
+        line = _Line(ux, uy, offset)
+        self.lines.setdefault((angle_bin, round(offset / self.tolerance)), []).append(line)
+        return line
+
+    def _segment(self, p, q):
+        tolerance = self.tolerance
+        if math.dist(p, q) <= tolerance:
+            return [(p, q)]
+        line = self._find_line(p, q)
+        tp = line.position(p)
+        tq = line.position(q)
+        forward = tp <= tq
+        a, b = (tp, tq) if forward else (tq, tp)
+        free = line.cover(a, b, tolerance)
+        if len(free) == 1 and free[0] == (a, b):
+            return [(p, q)]
+
+        self.segments += 1
+        self.removed += (b - a) - sum(stop - start for start, stop in free)
+
+        def point(t):
+            # Pieces that end where the segment does keep its exact endpoint.
+            if t == tp:
+                return p
+            if t == tq:
+                return q
+            f = (t - tp) / (tq - tp)
+            return (p[0] + (q[0] - p[0]) * f, p[1] + (q[1] - p[1]) * f)
+
+        pieces = [(point(start), point(stop)) for start, stop in free]
+        if not forward:
+            pieces = [(end, start) for start, end in reversed(pieces)]
+        return pieces
+
+    def _curve(self, stroke):
+        key = tuple(_snap(pt, self.tolerance) for pt in stroke)
+        key = min(key, key[::-1])
+        if key not in self.curves:
+            self.curves.add(key)
+            return True
+        self.segments += 1
+        self.removed += _curve_length(stroke, self.tolerance)
+        return False
+
+    def cell(self, strokes, outline=None):
+        # outline is the PreparedOutline whose frame frame_space strokes are
+        # in; they are compared in document coordinates, so shapes in
+        # different frames still line up, and come back in their own frame.
+        out = []
+        for stroke in strokes:
+            doc = [outline.to_document(pt) for pt in stroke] if outline is not None else stroke
+            if isinstance(stroke, Bezier):
+                if self._curve(doc):
+                    out.append(stroke)
+                continue
+            current = None
+            for i, (p, q) in enumerate(zip(doc, doc[1:])):
+                for start, end in self._segment(p, q):
+                    if outline is not None:
+                        start = _back(start, p, q, stroke[i], stroke[i + 1], outline)
+                        end = _back(end, p, q, stroke[i], stroke[i + 1], outline)
+                    if current is not None and current[-1] == start:
+                        current.append(end)
+                    else:
+                        current = [start, end]
+                        out.append(current)
+        return out
+
+    def cells(self, cells, profile=None, outline=None):
+        segments = self.segments
+        try:
+            for strokes in cells:
+                before = self.segments
+                kept = self.cell(strokes, outline)
+                if isinstance(strokes, TemplateCell) and self.segments == before:
+                    # Untouched template cells keep their type for the emitter.
+                    kept = strokes
+                if kept:
+                    yield kept
+        finally:
+            if profile is not None:
+                profile.count("duplicate_cuts", self.segments - segments)
+
+
+def _back(pt, p, q, frame_p, frame_q, outline):
+    # Segment ends map back to the exact frame points they came from.
+    if pt == p:
+        return frame_p
+    if pt == q:
+        return frame_q
+    return outline.to_frame(pt)
+
+
+def dedupe_cells(cells, tolerance=1e-3):
+    # Returns (cells, removed length) for a single stream.
+    deduper = CutDeduper(tolerance)
+    kept = list(deduper.cells(cells))
+    return kept, deduper.removed
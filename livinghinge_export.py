@@ -0,0 +1,138 @@
+# Living Hinge file export
+# - Writes hinge cells straight to a DXF or standalone SVG file
+# - Buffered text writes, one chunk per cell; no DOM is built
+# - Coordinates are shifted so the outline's bounding box starts at the
+#   origin (DXF is y-up, so it is also flipped) and scaled to the output unit
+
+from livinghinge import Bezier, _flatten_cubic, _flatten_quadratic, _formatter
+
+# File formats export_cells writes, as accepted by --export.
+EXPORT_FORMATS = ("svg", "dxf")
+
+# $INSUNITS codes; anything else is written as unitless.
+_DXF_UNITS = {"in": 1, "ft": 2, "mm": 4, "cm": 5, "m": 6}
+_MM_PER_UNIT = {"mm": 1.0, "cm": 10.0, "in": 25.4, "pt": 25.4 / 72, "pc": 25.4 / 6, "px": 25.4 / 96}
+
+_BUFFER_SIZE = 1 << 20
+
+
+def _flatten(stroke, tolerance):
+    pts = [stroke[0]]
+    if len(stroke) == 4:
+        _flatten_cubic(stroke[0], stroke[1], stroke[2], stroke[3], tolerance, pts)
+    else:
+        _flatten_quadratic(stroke[0], stroke[1], stroke[2], tolerance, pts)
+    return pts
+
+
+def write_svg(path, cells, bounds, unit="mm", scale=1.0, precision=3):
+    # bounds is (x, y, width, height) of the outline in input coordinates;
+    # scale takes input coordinates to unit.
+    fmt = _formatter(precision)
+    min_x, min_y, width, height = bounds
+    stroke_width = 0.25 / _MM_PER_UNIT.get(unit, 1.0)
+    size = ""
+    if unit in _MM_PER_UNIT:
+        size = f' width="{fmt(width * scale)}{unit}" height="{fmt(height * scale)}{unit}"'
+
+    def point(pt):
+        return f"{fmt((pt[0] - min_x) * scale)},{fmt((pt[1] - min_y) * scale)}"
+
+    count = 0
+    with open(path, "w", encoding="utf-8", buffering=_BUFFER_SIZE) as fh:
+        fh.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<svg xmlns="http://www.w3.org/2000/svg"{size} '
+            f'viewBox="0 0 {fmt(width * scale)} {fmt(height * scale)}">\n'
+            f'<g fill="none" stroke="#000000" stroke-width="{fmt(stroke_width)}" '
+            'stroke-linecap="round">\n'
+        )
+        for cell in cells:
+            d_parts = []
+            pen = None
+            for stroke in cell:
+                if len(stroke) < 2:
+                    continue
+                if isinstance(stroke, Bezier):
+                    if stroke[0] != pen:
+                        d_parts.append("M" + point(stroke[0]))
+                    command = "C" if len(stroke) == 4 else "Q"
+                    d_parts.append(command + " ".join(point(pt) for pt in stroke[1:]))
+                else:
+                    d_parts.append("M" + point(stroke[0]))
+                    d_parts.append("L" + " ".join(point(pt) for pt in stroke[1:]))
+                pen = stroke[-1]
+            if d_parts:
+                fh.write(f'<path d="{"".join(d_parts)}"/>\n')
+                count += 1
+        fh.write("</g>\n</svg>\n")
+    return count
+
+
+# R12 tables: the CONTINUOUS linetype and the HINGE layer every entity is on.
+_DXF_TABLES = (
+    "0\nSECTION\n2\nTABLES\n"
+    "0\nTABLE\n2\nLTYPE\n70\n1\n"
+    "0\nLTYPE\n2\nCONTINUOUS\n70\n0\n3\nSolid line\n72\n65\n73\n0\n40\n0.0\n"
+    "0\nENDTAB\n"
+    "0\nTABLE\n2\nLAYER\n70\n1\n"
+    "0\nLAYER\n2\nHINGE\n70\n0\n62\n7\n6\nCONTINUOUS\n"
+    "0\nENDTAB\n"
+    "0\nENDSEC\n"
+)
+
+
+def write_dxf(path, cells, bounds, unit="mm", scale=1.0, precision=3):
+    # An ASCII R12 (AC1009) DXF: header, layer table and entities. R12 needs
+    # no handles or objects section, and every CAD and laser package reads
+    # it. Two-point strokes become LINEs, longer ones POLYLINEs; curves are
+    # flattened to the output precision. $INSUNITS is newer than R12 but
+    # readers that do not know it skip it.
+    fmt = _formatter(precision)
+    min_x, min_y, _, height = bounds
+    max_y = min_y + height
+    tolerance = 0.5 * 10.0 ** -precision / scale
+
+    count = 0
+    with open(path, "w", encoding="ascii", buffering=_BUFFER_SIZE) as fh:
+        fh.write(
+            "0\nSECTION\n2\nHEADER\n9\n$ACADVER\n1\nAC1009\n"
+            f"9\n$INSUNITS\n70\n{_DXF_UNITS.get(unit, 0)}\n0\nENDSEC\n"
+            + _DXF_TABLES
+            + "0\nSECTION\n2\nENTITIES\n"
+        )
+        for cell in cells:
+            chunk = []
+            for stroke in cell:
+                if isinstance(stroke, Bezier):
+                    stroke = _flatten(stroke, tolerance)
+                if len(stroke) < 2:
+                    continue
+                xy = [(fmt((x - min_x) * scale), fmt((max_y - y) * scale)) for x, y in stroke]
+                if len(xy) == 2:
+                    (x0, y0), (x1, y1) = xy
+                    chunk.append(
+                        "0\nLINE\n8\nHINGE\n"
+                        f"10\n{x0}\n20\n{y0}\n30\n0\n11\n{x1}\n21\n{y1}\n31\n0\n"
+                    )
+                    continue
+                closed = xy[0] == xy[-1]
+                if closed:
+                    xy.pop()
+                chunk.append(
+                    "0\nPOLYLINE\n8\nHINGE\n66\n1\n10\n0\n20\n0\n30\n0\n"
+                    f"70\n{1 if closed else 0}\n"
+                )
+                chunk.extend(f"0\nVERTEX\n8\nHINGE\n10\n{x}\n20\n{y}\n30\n0\n" for x, y in xy)
+                chunk.append("0\nSEQEND\n8\nHINGE\n")
+            if chunk:
+                fh.write("".join(chunk))
+                count += 1
+        fh.write("0\nENDSEC\n0\nEOF\n")
+    return count
+
+
+def export_cells(path, fmt, cells, bounds, unit="mm", scale=1.0, precision=3):
+    # Returns the number of cells written.
+    writer = write_dxf if fmt == "dxf" else write_svg
+    return writer(path, cells, bounds, unit=unit, scale=scale, precision=precision)
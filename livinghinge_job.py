@@ -0,0 +1,410 @@
+# Living Hinge job setup
+# - Option definitions shared by the Inkscape extension and the batch CLI
+# - Resolves pattern sizes and runs generate -> dedupe -> stitch -> order
+#   without inkex
+
+import argparse
+import hashlib
+import importlib
+from array import array
+from contextlib import nullcontext
+from itertools import chain, repeat
+
+from shapes import get_shape, get_config
+from livinghinge import PreparedOutline, iter_hinge, stitch_cells
+from livinghinge_cache import ResultCache, cache_key
+from livinghinge_dedup import CutDeduper
+from livinghinge_export import EXPORT_FORMATS
+from livinghinge_parallel import generate_hinges_parallel
+from livinghinge_order import optimize_cut_order
+from livinghinge_profile import Profile
+
+# Draft quality: curve and outline tolerance as a fraction of the cell size,
+# the outline flattening step in user units (final uses 0.25) and the most
+# cells drawn across the whole job.
+DRAFT_COARSENESS = 0.05
+DRAFT_FLATNESS = 2.0
+DRAFT_MAX_CELLS = 5000
+
+PATTERN_TYPES = ("line", "fishbone", "cross", "bezier", "wave", "fabric", "circle")
+
+
+def str_to_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("true", "1", "yes", "on")
+
+
+def add_hinge_arguments(pars, boolean=str_to_bool):
+    pars.add_argument("--units", default="mm")
+    pars.add_argument("--angle", type=float, default=0.0)
+    pars.add_argument("--tolerance", type=float, default=0.05)
+    pars.add_argument("--simplify", type=float, default=0.02)
+    pars.add_argument("--curves", type=boolean, default=False)
+    pars.add_argument("--type", default="line")
+    pars.add_argument("--backend", default="python")
+    pars.add_argument("--workers", type=int, default=0)
+    pars.add_argument("--tile_size", type=float, default=0.0)
+    pars.add_argument("--dedupe", type=float, default=0.0)
+    pars.add_argument("--stitch", type=boolean, default=True)
+    pars.add_argument("--optimize_order", type=boolean, default=False)
+    pars.add_argument("--incremental", type=boolean, default=True)
+    pars.add_argument("--quality", default="final", choices=("final", "draft"))
+    pars.add_argument("--profile", default="off", choices=("off", "stderr", "json"))
+    pars.add_argument("--export", default="document", choices=("document",) + EXPORT_FORMATS)
+    pars.add_argument("--export_path", default="")
+    pars.add_argument("--precision", type=int, default=3)
+    pars.add_argument("--frame_output", type=boolean, default=False)
+    pars.add_argument("--cache_dir", default="")
+    pars.add_argument("--cache_size", type=float, default=256.0)
+    pars.add_argument("--line_height_pct", type=int, default=80)
+    pars.add_argument("--line_x_spacing", type=float, default=2.0)
+    pars.add_argument("--line_y_spacing", type=float, default=2.0)
+    pars.add_argument("--fishbone_height", type=float, default=10.0)
+    pars.add_argument("--fishbone_width", type=float, default=5.0)
+    pars.add_argument("--fishbone_x_spacing", type=float, default=2.0)
+    pars.add_argument("--fishbone_y_spacing", type=float, default=2.0)
+    pars.add_argument("--cross_height", type=float, default=10.0)
+    pars.add_argument("--cross_width", type=float, default=5.0)
+    pars.add_argument("--bezier_height", type=float, default=10.0)
+    pars.add_argument("--bezier_width", type=float, default=5.0)
+    pars.add_argument("--bezier_x_spacing", type=float, default=2.0)
+    pars.add_argument("--bezier_y_spacing", type=float, default=2.0)
+    pars.add_argument("--wave_height", type=float, default=10.0)
+    pars.add_argument("--wave_width", type=float, default=5.0)
+    pars.add_argument("--fabric_height", type=float, default=10.0)
+    pars.add_argument("--fabric_width", type=float, default=5.0)
+    pars.add_argument("--circle_height", type=float, default=5.0)
+    pars.add_argument("--circle_width", type=float, default=5.0)
+    pars.add_argument("--circle_x_spacing", type=float, default=2.0)
+    pars.add_argument("--circle_y_spacing", type=float, default=2.0)
+
+
+def is_draft(opts):
+    return getattr(opts, "quality", "final") == "draft"
+
+
+def final_quality(opts):
+    # Files go to the cutter, so exports never take the draft shortcuts.
+    if not is_draft(opts):
+        return opts
+    return argparse.Namespace(**dict(vars(opts), quality="final"))
+
+
+def engine_backend(opts, msg=None):
+    # The engine that will run the job. The engine itself falls back to
+    # Python without a word, so say it here, once, when the choice cannot be
+    # honoured.
+    if opts.backend != "numpy":
+        return "python"
+    if opts.curves:
+        note = "Curve output needs the Python engine; using it."
+    else:
+        try:
+            importlib.import_module("livinghinge_numpy")
+        except ImportError:
+            note = "NumPy is not available; using the Python engine."
+        else:
+            return "numpy"
+    if msg:
+        msg(note)
+    return "python"
+
+
+def open_cache(opts, hinge_args):
+    # None when caching is off, or for output the cache does not keep: drafts
+    # are cut short and frame-space cells would lose their templates.
+    cache_dir = getattr(opts, "cache_dir", "")
+    if not cache_dir or is_draft(opts) or hinge_args.get("frame_space"):
+        return None
+    size = getattr(opts, "cache_size", 0)
+    try:
+        return ResultCache(cache_dir, int(size * 1024 * 1024) if size > 0 else None)
+    except OSError:
+        # An unusable cache directory only costs the speed-up.
+        return None
+
+
+def pattern_type_of(opts):
+    pattern_type = opts.type or "line"
+    if pattern_type not in PATTERN_TYPES:
+        pattern_type = "line"
+    return pattern_type
+
+
+def pattern_dimensions(pattern_type, opts, to_uu):
+    # to_uu converts a value given in opts.units to user units.
+    if pattern_type == "line":
+        height = opts.line_height_pct / 100.0
+        width = 0
+        x_spacing = to_uu(opts.line_x_spacing)
+        y_spacing = to_uu(opts.line_y_spacing)
+    elif pattern_type == "fishbone":
+        height = to_uu(opts.fishbone_height)
+        width = to_uu(opts.fishbone_width)
+        x_spacing = to_uu(opts.fishbone_x_spacing)
+        y_spacing = to_uu(opts.fishbone_y_spacing)
+    elif pattern_type == "cross":
+        height = to_uu(opts.cross_height)
+        width = to_uu(opts.cross_width)
+        x_spacing = 0
+        y_spacing = 0
+    elif pattern_type == "bezier":
+        height = to_uu(opts.bezier_height)
+        width = to_uu(opts.bezier_width)
+        x_spacing = to_uu(opts.bezier_x_spacing)
+        y_spacing = to_uu(opts.bezier_y_spacing)
+    elif pattern_type == "wave":
+        height = to_uu(opts.wave_height)
+        width = to_uu(opts.wave_width)
+        x_spacing = 0
+        y_spacing = 0
+    elif pattern_type == "fabric":
+        height = to_uu(opts.fabric_height)
+        width = to_uu(opts.fabric_width)
+        x_spacing = 0
+        y_spacing = 0
+    elif pattern_type == "circle":
+        height = to_uu(opts.circle_height)
+        width = to_uu(opts.circle_width)
+        x_spacing = to_uu(opts.circle_x_spacing)
+        y_spacing = to_uu(opts.circle_y_spacing)
+    else:
+        height = opts.line_height_pct / 100.0
+        width = 0
+        x_spacing = to_uu(opts.line_x_spacing)
+        y_spacing = to_uu(opts.line_y_spacing)
+    return height, width, x_spacing, y_spacing
+
+
+def hinge_arguments(opts, bbox, to_uu, angle_rad, msg=None):
+    # Keyword arguments for generate_hinge/iter_hinge, minus the polygons,
+    # plus the dedupe tolerance that run_hinge_job takes back out. bbox is
+    # (x, y, width, height) of the whole selection; msg gets the engine
+    # fallback note, if any.
+    pattern_type = pattern_type_of(opts)
+    config_fn = get_config(pattern_type)
+    height, width, x_spacing, y_spacing, y_offset = config_fn(
+        *pattern_dimensions(pattern_type, opts, to_uu), bbox
+    )
+
+    if height <= 0:
+        raise ValueError("Height must be greater than zero.")
+    if width < 0:
+        raise ValueError("Width must not be negative.")
+
+    tolerance = to_uu(opts.tolerance) if opts.tolerance > 0 else None
+    simplify = to_uu(opts.simplify) if opts.simplify > 0 else None
+    draft = is_draft(opts)
+    if draft:
+        # Curves and outlines only need to look right at preview size.
+        coarse = max(height, width) * DRAFT_COARSENESS
+        tolerance = max(tolerance or 0.0, coarse)
+        simplify = max(simplify or 0.0, coarse)
+
+    return dict(
+        shape_fn=get_shape(pattern_type),
+        height=height,
+        width=width,
+        x_spacing=x_spacing,
+        y_spacing=y_spacing,
+        y_offset=y_offset,
+        angle_rad=angle_rad,
+        backend=engine_backend(opts, msg),
+        tolerance=tolerance,
+        simplify=simplify,
+        curves=opts.curves,
+        draft=draft,
+        tile_size=to_uu(opts.tile_size) if opts.tile_size > 0 else None,
+        dedupe=to_uu(opts.dedupe) if opts.dedupe > 0 else None,
+    )
+
+
+def polygons_bbox(shape_polygons):
+    xs = [p[0] for polygons in shape_polygons for poly in polygons for p in poly]
+    ys = [p[1] for polygons in shape_polygons for poly in polygons for p in poly]
+    return (min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys))
+
+
+# Options that change the cuts; backend and workers only change how fast.
+_OUTPUT_OPTIONS = ("stitch", "optimize_order", "quality", "frame_output", "precision")
+
+
+def shape_hash(polygons, hinge_args, opts):
+    # Fingerprint of everything one shape's hinge depends on: its flattened
+    # outline, the resolved pattern parameters and angle, and the output
+    # options.
+    params = {
+        key: getattr(value, "__name__", value)
+        for key, value in hinge_args.items()
+        if key != "backend"
+    }
+    params.update((name, getattr(opts, name, None)) for name in _OUTPUT_OPTIONS)
+    digest = hashlib.sha1(repr(sorted(params.items())).encode())
+    for poly in polygons:
+        digest.update(array("d", chain.from_iterable(poly)).tobytes())
+        digest.update(b"|")
+    return digest.hexdigest()[:16]
+
+
+def _boxes_touch(a, b, margin):
+    return (
+        a[0] - margin <= b[0] + b[2] and b[0] - margin <= a[0] + a[2]
+        and a[1] - margin <= b[1] + b[3] and b[1] - margin <= a[1] + a[3]
+    )
+
+
+def stale_shapes(current, previous, dedupe=None):
+    # current is [(source, hash, bbox)] for this run, previous maps source to
+    # the (hash, bbox) recorded last time. Returns the indexes into current
+    # that have to be generated again.
+    stale = {
+        index for index, (source, key, _) in enumerate(current)
+        if previous.get(source, (None,))[0] != key
+    }
+    if not dedupe:
+        return stale
+    # A cut shared by two shapes was kept by whichever came first, so a change
+    # spreads to every shape whose box touches one that changed, old or new.
+    boxes = []
+    pending = list(stale)
+    while pending:
+        index = pending.pop()
+        source, _, bbox = current[index]
+        boxes.append(bbox)
+        if source in previous:
+            boxes.append(previous[source][1])
+        for other, (_, _, other_box) in enumerate(current):
+            if other not in stale and any(_boxes_touch(other_box, box, dedupe) for box in boxes):
+                stale.add(other)
+                pending.append(other)
+    return stale
+
+
+def run_hinge_job(shape_polygons, hinge_args, opts, profile=None, outlines=None):
+    # outlines optionally holds a PreparedOutline per shape, built for this
+    # angle and simplification and reused across calls; the worker pool
+    # prepares its own. Returns (one cell stream per shape, report). report
+    # may hold "travel", (before, after) for the cut order, and "dedupe",
+    # whose removed length is only final once the streams are used up, and
+    # "cache", the ResultCache when --cache_dir is set. A cache hit skips
+    # everything up to the cut order and has no "dedupe".
+    # Streams stay lazy unless the cut order has to see everything.
+    report = {}
+    draft = is_draft(opts)
+    cache = open_cache(opts, hinge_args)
+    if cache is not None:
+        report["cache"] = cache
+        with profile_phase(profile, "cache"):
+            key = cache_key(shape_polygons, hinge_args, opts.stitch)
+            results = cache.get(key)
+        if profile is not None:
+            profile.count("cache_hits", cache.hits)
+            profile.count("cache_misses", cache.misses)
+        if results is not None and len(results) == len(shape_polygons):
+            return _ordered(results, opts, report, profile)
+    hinge_args = dict(hinge_args)
+    dedupe = hinge_args.pop("dedupe", None)
+    frames = [None] * len(shape_polygons)
+    if hinge_args.get("frame_space") and hinge_args["angle_rad"]:
+        # Each shape's cuts are rotated about its own centre, so dedupe and
+        # the cut order map them through that shape's outline frame.
+        if outlines is None:
+            outlines = [
+                PreparedOutline(polygons, hinge_args["angle_rad"], hinge_args["simplify"])
+                for polygons in shape_polygons
+            ]
+        frames = outlines
+    if opts.workers > 0 and not draft:
+        with profile_phase(profile, "generate"):
+            results = generate_hinges_parallel(
+                [dict(hinge_args, polygons=polygons) for polygons in shape_polygons],
+                workers=opts.workers,
+                profile=profile,
+            )
+    else:
+        outlines = outlines or [None] * len(shape_polygons)
+        results = (
+            _timed(profile, "generate", iter_hinge(
+                polygons=polygons, profile=profile, prepared=prepared, **hinge_args
+            ))
+            for polygons, prepared in zip(shape_polygons, outlines)
+        )
+
+    if draft:
+        # Previews draw at most a fixed number of cells, picked at an even
+        # stride over every shape so the whole sheet shows.
+        results = _sampled([list(cells) for cells in results], DRAFT_MAX_CELLS)
+
+    if dedupe and not draft:
+        # One deduper for every shape, so overlapping selections are caught.
+        deduper = report["dedupe"] = CutDeduper(dedupe)
+        results = (
+            _timed(profile, "dedupe", deduper.cells(cells, profile, frame))
+            for cells, frame in zip(results, frames)
+        )
+
+    if opts.stitch and not draft:
+        results = (_timed(profile, "stitch", stitch_cells(cells)) for cells in results)
+
+    if cache is not None:
+        results = cache.storing(key, results)
+
+    if draft:
+        return results, report
+    return _ordered(results, opts, report, profile, frames)
+
+
+def _ordered(results, opts, report, profile, frames=None):
+    if not opts.optimize_order:
+        return results, report
+
+    # Each shape is ordered on its own so its cuts stay together, starting
+    # where the previous shape's tour ended. pos is in document coordinates;
+    # frames maps it in and out of frame_space shapes.
+    ordered = []
+    before = after = 0.0
+    pos = (0.0, 0.0)
+    for cells, frame in zip(results, frames or repeat(None)):
+        cells = list(cells)
+        start = frame.to_frame(pos) if frame is not None else pos
+        with profile_phase(profile, "order"):
+            cells, shape_before, shape_after = optimize_cut_order(cells, start=start)
+        ordered.append(cells)
+        before += shape_before
+        after += shape_after
+        if len(cells):
+            pos = cells[-1][-1][-1]
+            if frame is not None:
+                pos = frame.to_document(pos)
+    report["travel"] = (before, after)
+    return ordered, report
+
+
+def _sampled(streams, limit):
+    total = sum(len(cells) for cells in streams)
+    if total <= limit:
+        return streams
+    sampled = []
+    index = 0
+    for cells in streams:
+        kept = []
+        for cell in cells:
+            # Exactly limit cells overall, spaced total / limit apart.
+            if (index + 1) * limit // total > index * limit // total:
+                kept.append(cell)
+            index += 1
+        sampled.append(kept)
+    return sampled
+
+
+def new_profile(opts):
+    return Profile() if getattr(opts, "profile", "off") != "off" else None
+
+
+def profile_phase(profile, name):
+    return profile.phase(name) if profile is not None else nullcontext()
+
+
+def _timed(profile, name, iterable):
+    return profile.timed(name, iterable) if profile is not None else iterable
@@ -0,0 +1,328 @@
+# Living Hinge Engine, NumPy backend
+# - Same inputs and output as livinghinge.iter_hinge
+# - Works a lattice column at a time with array math instead of per-point loops
+
+import math
+from time import perf_counter
+
+import numpy as np
+
+from livinghinge import (
+    TemplateCell,
+    _lattice_steps,
+    _rotate_polygons,
+    _row_window,
+    compile_template,
+    simplify_polygons,
+)
+
+# Boundary rows per clipping batch; keeps the segment x edge matrices small.
+_ROW_CHUNK = 16
+
+
+def _edge_arrays(polygons):
+    edges = []
+    owners = []
+    for index, poly in enumerate(polygons):
+        for i in range(len(poly) - 1):
+            edges.append((poly[i][0], poly[i][1], poly[i + 1][0], poly[i + 1][1]))
+            owners.append(index)
+    edges = np.array(edges, dtype=float).reshape(-1, 4)
+    onehot = np.zeros((len(owners), len(polygons)), dtype=np.int64)
+    onehot[np.arange(len(owners)), owners] = 1
+    return edges, onehot
+
+
+def _outline_arrays(polygons_rot):
+    edges, onehot = _edge_arrays(polygons_rot)
+    return (
+        edges,
+        onehot,
+        np.minimum(edges[:, 0], edges[:, 2]),
+        np.maximum(edges[:, 0], edges[:, 2]),
+        np.minimum(edges[:, 1], edges[:, 3]),
+        np.maximum(edges[:, 1], edges[:, 3]),
+        onehot.argmax(axis=1),
+        np.array([min(p[0] for p in poly) for poly in polygons_rot]),
+        np.array([max(p[0] for p in poly) for poly in polygons_rot]),
+    )
+
+
+def _contains(px, py, edges, onehot):
+    # Even-odd test per polygon with a vertical ray, then a union over the
+    # polygons like point_in_polys. Only edges spanning px can be crossed, so
+    # callers may pass just the edges of the current lattice column. Used for
+    # cell centres, which are never close to an edge.
+    if len(px) == 0 or len(edges) == 0:
+        return np.zeros(len(px), dtype=bool)
+    x1, y1, x2, y2 = edges[:, 0], edges[:, 1], edges[:, 2], edges[:, 3]
+    spans = (x1[None, :] > px[:, None]) != (x2[None, :] > px[:, None])
+    dx = np.where(x2 == x1, 1.0, x2 - x1)
+    y_int = (y2 - y1)[None, :] * (px[:, None] - x1[None, :]) / dx[None, :] + y1[None, :]
+    hits = spans & (py[:, None] < y_int)
+    counts = hits.astype(np.int64) @ onehot
+    return (counts % 2 == 1).any(axis=1)
+
+
+def _contains_exact(px, py, edges, onehot):
+    # Same horizontal ray and rounding as _point_in_poly, for midpoints that
+    # may sit on an edge. Only edges spanning py matter, so callers may pass
+    # the edges of a horizontal strip around the points.
+    if len(px) == 0 or len(edges) == 0:
+        return np.zeros(len(px), dtype=bool)
+    x1, y1, x2, y2 = edges[:, 0], edges[:, 1], edges[:, 2], edges[:, 3]
+    spans = (y1[None, :] > py[:, None]) != (y2[None, :] > py[:, None])
+    x_int = (x2 - x1)[None, :] * (py[:, None] - y1[None, :]) / (y2 - y1 + 1e-9)[None, :] + x1[None, :]
+    hits = spans & (px[:, None] < x_int)
+    counts = hits.astype(np.int64) @ onehot
+    return (counts % 2 == 1).any(axis=1)
+
+
+def _clip_rows(x, ys, template, edges, strip_edges, strip_onehot):
+    # Clip every template segment of the given boundary rows at once.
+    # Returns piece endpoints plus the row each piece belongs to.
+    seg = template
+    k = len(seg)
+    x0 = np.broadcast_to(x + seg[:, 0], (len(ys), k)).ravel()
+    y0 = (ys[:, None] + seg[None, :, 1]).ravel()
+    x1 = np.broadcast_to(x + seg[:, 2], (len(ys), k)).ravel()
+    y1 = (ys[:, None] + seg[None, :, 3]).ravel()
+    row_of = np.repeat(np.arange(len(ys)), k)
+
+    x2, y2, x3, y3 = (edges[:, i][None, :] for i in range(4))
+    ddx = (x1 - x0)[:, None]
+    ddy = (y1 - y0)[:, None]
+    ex = x2 - x0[:, None]
+    ey = y2 - y0[:, None]
+    denom = ddx * (y3 - y2) - ddy * (x3 - x2)
+    valid = np.abs(denom) > 1e-12
+    safe = np.where(valid, denom, 1.0)
+    t = (ex * (y3 - y2) - ey * (x3 - x2)) / safe
+    u = (ex * ddy - ey * ddx) / safe
+    hit = valid & (t >= -1e-9) & (t <= 1 + 1e-9) & (u >= -1e-9) & (u <= 1 + 1e-9)
+
+    ts = np.where(hit, np.clip(t, 0.0, 1.0), np.nan)
+    ts = np.concatenate([np.zeros((len(x0), 1)), np.ones((len(x0), 1)), ts], axis=1)
+    ts.sort(axis=1)
+    t0 = ts[:, :-1]
+    t1 = ts[:, 1:]
+    keep = (t1 - t0) >= 1e-6
+
+    seg_idx, _ = np.nonzero(keep)
+    t0 = t0[keep]
+    t1 = t1[keep]
+    sx, sy = x0[seg_idx], y0[seg_idx]
+    vx, vy = x1[seg_idx] - sx, y1[seg_idx] - sy
+    mid = (t0 + t1) * 0.5
+    inside = _contains_exact(sx + vx * mid, sy + vy * mid, strip_edges, strip_onehot)
+
+    seg_idx = seg_idx[inside]
+    t0 = t0[inside]
+    t1 = t1[inside]
+    sx, sy, vx, vy = sx[inside], sy[inside], vx[inside], vy[inside]
+    pieces = np.stack([sx + vx * t0, sy + vy * t0, sx + vx * t1, sy + vy * t1], axis=1)
+    return pieces, row_of[seg_idx]
+
+
+def iter_hinge_numpy(
+    polygons,
+    shape_fn,
+    height,
+    width,
+    x_spacing,
+    y_spacing,
+    y_offset,
+    angle_rad=0.0,
+    shape_kwargs=None,
+    column_range=None,
+    profile=None,
+    tolerance=None,
+    simplify=None,
+    draft=False,
+    frame_space=False,
+    prepared=None,
+    frame=None,
+    row_window=None,
+):
+    if not polygons:
+        return iter(())
+
+    prepare_start = perf_counter()
+    if simplify and prepared is None:
+        polygons = simplify_polygons(polygons, simplify)
+
+    cell_width = width + x_spacing
+    cell_height = height + y_spacing
+
+    if cell_width <= 0 or cell_height <= 0:
+        raise ValueError("Cell dimensions must be positive")
+
+    if prepared is not None:
+        frame = prepared.frame
+    cx, cy, polygons_rot, (min_x, min_y, max_x, max_y) = (
+        frame or _rotate_polygons(polygons, angle_rad)
+    )
+    cos_a = math.cos(angle_rad)
+    sin_a = math.sin(angle_rad)
+
+    template = compile_template(shape_fn, height, width, shape_kwargs, tolerance)
+    if template.box is None:
+        return iter(())
+    pad = 1e-6
+    box_x0 = template.box[0] - pad
+    box_y0 = template.box[1] - pad
+    box_x1 = template.box[2] + pad
+    box_y1 = template.box[3] + pad
+    tpl = np.array(template.segments, dtype=float).reshape(-1, 4)
+    # Draft clips only the axis-aligned segments and keeps the rest whole
+    # or drops them.
+    clip_tpl = tpl
+    whole_tpl = tpl[:0]
+    if draft:
+        aligned = np.array([axis is not None for axis in template.axes], dtype=bool)
+        clip_tpl = tpl[aligned]
+        whole_tpl = tpl[~aligned]
+
+    arrays = prepared.arrays.get("numpy") if prepared is not None else None
+    if arrays is None:
+        arrays = _outline_arrays(polygons_rot)
+        if prepared is not None:
+            prepared.arrays["numpy"] = arrays
+    (edges, onehot, edge_min_x, edge_max_x, edge_min_y, edge_max_y, edge_owner,
+     poly_min_x, poly_max_x) = arrays
+    eps = 1e-9
+
+    def rotate_back(pts):
+        # pts is (n, 4) of segment endpoints in the lattice frame.
+        if frame_space:
+            return pts
+        out = np.empty_like(pts)
+        for i in (0, 2):
+            dx = pts[:, i] - cx
+            dy = pts[:, i + 1] - cy
+            out[:, i] = cx + dx * cos_a - dy * sin_a
+            out[:, i + 1] = cy + dx * sin_a + dy * cos_a
+        return out
+
+    columns = _lattice_steps(min_x - cell_width, max_x + cell_width + 0.001, cell_width)
+    rows = tuple(np.array(ys) for ys in _row_window((
+        _lattice_steps(min_y - cell_height, max_y + cell_height + 0.001, cell_height),
+        _lattice_steps(min_y - cell_height + y_offset, max_y + cell_height + 0.001, cell_height),
+    ), row_window))
+
+    col_start, col_stop = column_range or (0, len(columns))
+
+    if profile is not None:
+        profile.add_time("prepare", perf_counter() - prepare_start)
+
+    def cells_by_column():
+        times = {"classify": 0.0, "interior": 0.0, "clip": 0.0}
+        counts = {"cells_visited": 0, "cells_interior": 0, "cells_boundary": 0,
+                  "segments_clipped": 0, "edge_tests": 0, "point_in_poly_calls": 0}
+        try:
+            for item in columns_of_cells(times, counts):
+                yield item
+        finally:
+            if profile is not None:
+                for name, seconds in times.items():
+                    profile.add_time(name, seconds)
+                for name, n in counts.items():
+                    profile.count(name, n)
+
+    def columns_of_cells(times, counts):
+        # Timers and counters move once per column, so they cost next to nothing.
+        for col_index in range(col_start, min(col_stop, len(columns))):
+            x = columns[col_index]
+            ys = rows[col_index % 2]
+            if len(ys) == 0:
+                continue
+            t0 = perf_counter()
+            counts["cells_visited"] += len(ys)
+            band = (edge_max_x >= x + box_x0 - eps) & (edge_min_x <= x + box_x1 + eps)
+            band_edges = edges[band]
+            band_onehot = onehot[band]
+            if len(band_edges) == 0:
+                # No outline in this column: every cell is on the same side, and
+                # with no edge spanning it that side is the outside.
+                continue
+
+            # The strip test below only needs polygons whose box overlaps this
+            # column: a ray from a point left of a closed ring crosses it an
+            # even number of times, and one right of it never does.
+            poly_near = (poly_max_x >= x + box_x0 - eps) & (poly_min_x <= x + box_x1 + eps)
+            column_edges = poly_near[edge_owner]
+
+            b_min_y = edge_min_y[band]
+            b_max_y = edge_max_y[band]
+            boundary = (
+                (ys[:, None] + box_y0 <= b_max_y[None, :] + eps) &
+                (ys[:, None] + box_y1 >= b_min_y[None, :] - eps)
+            ).any(axis=1)
+
+            clear = np.nonzero(~boundary)[0]
+            centre_x = np.full(len(clear), x + (box_x0 + box_x1) * 0.5)
+            centre_y = ys[clear] + (box_y0 + box_y1) * 0.5
+            interior = clear[_contains(centre_x, centre_y, band_edges, band_onehot)]
+            counts["edge_tests"] += len(ys) * len(band_edges)
+            counts["point_in_poly_calls"] += len(clear)
+            counts["cells_interior"] += len(interior)
+            t1 = perf_counter()
+            times["classify"] += t1 - t0
+
+            cells = {}
+            if len(interior):
+                k = len(tpl)
+                pts = np.empty((len(interior), k, 4))
+                pts[:, :, 0] = x + tpl[None, :, 0]
+                pts[:, :, 1] = ys[interior][:, None] + tpl[None, :, 1]
+                pts[:, :, 2] = x + tpl[None, :, 2]
+                pts[:, :, 3] = ys[interior][:, None] + tpl[None, :, 3]
+                pts = rotate_back(pts.reshape(-1, 4)).reshape(len(interior), k, 4)
+                for row, segs in zip(interior.tolist(), pts.tolist()):
+                    cells[row] = [[(s[0], s[1]), (s[2], s[3])] for s in segs]
+                    if frame_space:
+                        cells[row] = TemplateCell(cells[row], (x, float(ys[row])), template.strokes)
+            t2 = perf_counter()
+            times["interior"] += t2 - t1
+
+            boundary_rows = np.nonzero(boundary)[0]
+            counts["cells_boundary"] += len(boundary_rows)
+            counts["segments_clipped"] += len(boundary_rows) * len(tpl)
+            for start in range(0, len(boundary_rows), _ROW_CHUNK):
+                chunk = boundary_rows[start:start + _ROW_CHUNK]
+                chunk_ys = ys[chunk]
+                lo = chunk_ys[0] + box_y0 - eps
+                hi = chunk_ys[-1] + box_y1 + eps
+                near = (b_max_y >= lo) & (b_min_y <= hi)
+                strip = column_edges & (edge_max_y >= lo) & (edge_min_y <= hi)
+                counts["edge_tests"] += len(chunk) * len(clip_tpl) * int(near.sum())
+                pieces, owner = _clip_rows(
+                    x, chunk_ys, clip_tpl, band_edges[near], edges[strip], onehot[strip]
+                )
+                if draft and len(whole_tpl):
+                    # Kept whole when both ends are inside, like the Python
+                    # engine's draft.
+                    k = len(whole_tpl)
+                    segs = np.empty((len(chunk), k, 4))
+                    segs[:, :, 0] = x + whole_tpl[None, :, 0]
+                    segs[:, :, 1] = chunk_ys[:, None] + whole_tpl[None, :, 1]
+                    segs[:, :, 2] = x + whole_tpl[None, :, 2]
+                    segs[:, :, 3] = chunk_ys[:, None] + whole_tpl[None, :, 3]
+                    segs = segs.reshape(-1, 4)
+                    keep = (
+                        _contains(segs[:, 0], segs[:, 1], band_edges, band_onehot)
+                        & _contains(segs[:, 2], segs[:, 3], band_edges, band_onehot)
+                    )
+                    pieces = np.concatenate([pieces, segs[keep]])
+                    owner = np.concatenate([owner, np.repeat(np.arange(len(chunk)), k)[keep]])
+                if not len(pieces):
+                    continue
+                pieces = rotate_back(pieces)
+                for row, seg in zip(chunk[owner].tolist(), pieces.tolist()):
+                    cells.setdefault(row, []).append([(seg[0], seg[1]), (seg[2], seg[3])])
+            times["clip"] += perf_counter() - t2
+
+            for row in sorted(cells):
+                yield cells[row]
+
+    return cells_by_column()
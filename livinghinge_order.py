@@ -0,0 +1,173 @@
+# Living Hinge cut ordering
+# - Reorders cells and flips strokes to cut down on rapid travel
+# - Nearest-neighbour tour over cell endpoints, then windowed 2-opt
+
+import math
+
+from livinghinge_compact import CompactCells
+
+
+def _reverse_cell(strokes):
+    return [stroke[::-1] for stroke in reversed(strokes)]
+
+
+def travel_distance(cells, start=(0.0, 0.0)):
+    pos = start
+    total = 0.0
+    for strokes in cells:
+        for stroke in strokes:
+            total += math.dist(pos, stroke[0])
+            pos = stroke[-1]
+    return total
+
+
+def _order_strokes(strokes):
+    # Greedy chaining inside one cell; cells rarely hold more than a few
+    # strokes once stitched, so a plain scan is enough.
+    if len(strokes) < 2:
+        return list(strokes)
+    remaining = list(strokes[1:])
+    ordered = [strokes[0]]
+    pos = strokes[0][-1]
+    while remaining:
+        best = None
+        best_dist = None
+        for index, stroke in enumerate(remaining):
+            for flip, end in ((False, stroke[0]), (True, stroke[-1])):
+                dist = math.dist(pos, end)
+                if best_dist is None or dist < best_dist:
+                    best, best_dist = (index, flip), dist
+        index, flip = best
+        stroke = remaining.pop(index)
+        if flip:
+            stroke = stroke[::-1]
+        ordered.append(stroke)
+        pos = stroke[-1]
+    return ordered
+
+
+class _EndpointGrid:
+    # Buckets both endpoints of every cell so the nearest unvisited one can be
+    # found by searching outward ring by ring.
+
+    def __init__(self, pieces):
+        points = [p for piece in pieces for p in (piece[0], piece[1])]
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        self.min_x = min(xs)
+        self.min_y = min(ys)
+        span = max(max(xs) - self.min_x, max(ys) - self.min_y, 1e-9)
+        self.cell = span / max(1.0, math.sqrt(len(pieces)))
+        self.buckets = {}
+        for index, (entry, exit_, _) in enumerate(pieces):
+            self.buckets.setdefault(self._key(entry), []).append((index, False))
+            self.buckets.setdefault(self._key(exit_), []).append((index, True))
+        self.max_i = max(i for i, _ in self.buckets)
+        self.max_j = max(j for _, j in self.buckets)
+
+    def _key(self, pt):
+        return (int((pt[0] - self.min_x) // self.cell), int((pt[1] - self.min_y) // self.cell))
+
+    def remove(self, index, piece):
+        for pt in (piece[0], piece[1]):
+            key = self._key(pt)
+            bucket = self.buckets.get(key)
+            if bucket:
+                bucket[:] = [item for item in bucket if item[0] != index]
+                if not bucket:
+                    del self.buckets[key]
+
+    def _ring(self, ci, cj, ring):
+        if ring == 0:
+            yield (ci, cj)
+            return
+        for i in range(ci - ring, ci + ring + 1):
+            yield (i, cj - ring)
+            yield (i, cj + ring)
+        for j in range(cj - ring + 1, cj + ring):
+            yield (ci - ring, j)
+            yield (ci + ring, j)
+
+    def nearest(self, pos, pieces):
+        ci, cj = self._key(pos)
+        max_ring = max(abs(ci), abs(self.max_i - ci), abs(cj), abs(self.max_j - cj))
+        best = None
+        best_dist = None
+        for ring in range(max_ring + 1):
+            if best_dist is not None and best_dist <= (ring - 1) * self.cell:
+                break
+            for key in self._ring(ci, cj, ring):
+                for index, flip in self.buckets.get(key, ()):
+                    end = pieces[index][1] if flip else pieces[index][0]
+                    dist = math.dist(pos, end)
+                    if best_dist is None or dist < best_dist:
+                        best, best_dist = (index, flip), dist
+        return best
+
+
+def _two_opt(tour, start, window, passes):
+    # tour holds [entry, exit, index, flipped]; reversing a stretch of the
+    # tour also flips every cell in it.
+    n = len(tour)
+    for _ in range(passes):
+        improved = False
+        for i in range(-1, n - 1):
+            a = start if i < 0 else tour[i][1]
+            for j in range(i + 2, min(n, i + 1 + window)):
+                b = tour[i + 1][0]
+                c = tour[j][1]
+                d = tour[j + 1][0] if j + 1 < n else None
+                old = math.dist(a, b) + (math.dist(c, d) if d is not None else 0.0)
+                new = math.dist(a, c) + (math.dist(b, d) if d is not None else 0.0)
+                if new < old - 1e-9:
+                    stretch = tour[i + 1:j + 1]
+                    stretch.reverse()
+                    for item in stretch:
+                        item[0], item[1] = item[1], item[0]
+                        item[3] = not item[3]
+                    tour[i + 1:j + 1] = stretch
+                    improved = True
+        if not improved:
+            break
+    return tour
+
+
+def optimize_cut_order(cells, start=(0.0, 0.0), window=32, passes=4):
+    # Returns (cells, travel_before, travel_after). Cells are kept packed
+    # while the tour is built, so only the endpoints live as Python objects.
+    packed = CompactCells()
+    pieces = []
+    before = 0.0
+    pos = start
+    for cell in cells:
+        if not cell:
+            continue
+        for stroke in cell:
+            before += math.dist(pos, stroke[0])
+            pos = stroke[-1]
+        strokes = _order_strokes(cell)
+        pieces.append((strokes[0][0], strokes[-1][-1], len(packed)))
+        packed.append(strokes)
+    if not pieces:
+        return packed, before, before
+
+    grid = _EndpointGrid(pieces)
+    tour = []
+    pos = start
+    for _ in range(len(pieces)):
+        index, flip = grid.nearest(pos, pieces)
+        grid.remove(index, pieces[index])
+        entry, exit_, _ = pieces[index]
+        if flip:
+            entry, exit_ = exit_, entry
+        tour.append([entry, exit_, index, flip])
+        pos = exit_
+
+    tour = _two_opt(tour, start, window, passes)
+
+    result = CompactCells()
+    for _, _, index, flip in tour:
+        strokes = packed[index]
+        result.append(_reverse_cell(strokes) if flip else strokes)
+    after = travel_distance(result, start)
+    return result, before, after
@@ -0,0 +1,81 @@
+# Living Hinge Engine, process pool
+# - Spreads independent shapes and lattice column bands across processes
+# - Results come back in submission order, so output matches a serial run
+# - Outlines and bands cross the process boundary as flat arrays, which
+#   pickle as a few buffers instead of one object per point
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from livinghinge import lattice_column_count
+from livinghinge_compact import CompactCells, generate_hinge_compact, pack_polygons
+from livinghinge_profile import Profile
+
+# Fewer columns than this per band costs more in pickling than it saves.
+MIN_BAND_COLUMNS = 8
+
+
+def _run_band(task):
+    kwargs, column_range, profiling = task
+    kwargs = dict(kwargs, polygons=kwargs["polygons"][0])
+    if not profiling:
+        return generate_hinge_compact(column_range=column_range, **kwargs), None
+    profile = Profile()
+    cells = generate_hinge_compact(column_range=column_range, profile=profile, **kwargs)
+    return cells, profile.as_dict()
+
+
+def _split_bands(jobs, workers, profiling):
+    counts = [
+        lattice_column_count(
+            job["polygons"], job["width"], job["x_spacing"], job.get("angle_rad", 0.0)
+        )
+        for job in jobs
+    ]
+    # Aim for a few bands per worker across the whole batch so big shapes
+    # get split while small ones stay whole.
+    band = max(MIN_BAND_COLUMNS, -(-sum(counts) // (workers * 4)))
+
+    tasks = []
+    owners = []
+    for index, (job, count) in enumerate(zip(jobs, counts)):
+        job = dict(job, polygons=pack_polygons(job["polygons"]))
+        for start in range(0, max(count, 1), band):
+            tasks.append((job, (start, start + band), profiling))
+            owners.append(index)
+    return tasks, owners
+
+
+def _count_results(results, profile):
+    # Size of what the job holds in memory once every band is back.
+    if profile is not None:
+        for cells in results:
+            profile.count("result_strokes", cells.stroke_count())
+            profile.count("result_points", cells.point_count())
+            profile.count("result_bytes", cells.nbytes())
+    return results
+
+
+def generate_hinges_parallel(jobs, workers=None, profile=None):
+    # One CompactCells per job. Worker phases are CPU time summed over
+    # processes, not wall time.
+    jobs = list(jobs)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or not jobs:
+        return _count_results(
+            [generate_hinge_compact(profile=profile, **job) for job in jobs], profile
+        )
+
+    tasks, owners = _split_bands(jobs, workers, profile is not None)
+    results = [CompactCells() for _ in jobs]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for owner, (cells, stats) in zip(owners, pool.map(_run_band, tasks)):
+                results[owner].extend(cells)
+                if stats:
+                    profile.merge(stats)
+    except (BrokenProcessPool, OSError):
+        # Some hosts cannot fork or spawn; fall back to doing it here.
+        results = [generate_hinge_compact(profile=profile, **job) for job in jobs]
+    return _count_results(results, profile)
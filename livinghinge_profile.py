@@ -0,0 +1,103 @@
+# Living Hinge profiling
+# - Wall time per phase and work counters for one hinge run
+# - Phases nest: time spent in an inner phase is not billed to the outer one
+
+import json
+import sys
+from time import perf_counter
+
+PHASE_ORDER = (
+    "flatten", "prepare", "classify", "interior", "clip", "rotate",
+    "cache", "generate", "dedupe", "stitch", "order", "emit", "write",
+)
+
+
+class Profile:
+    def __init__(self):
+        self.phases = {}
+        self.counters = {}
+        self._stack = []
+
+    def _enter(self):
+        self._stack.append([perf_counter(), 0.0])
+
+    def _exit(self, name):
+        start, inner = self._stack.pop()
+        elapsed = perf_counter() - start
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed - inner
+        if self._stack:
+            self._stack[-1][1] += elapsed
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def add_time(self, name, seconds):
+        # For times measured by hand inside an open phase (the hot loops
+        # avoid the context manager).
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+        if self._stack:
+            self._stack[-1][1] += seconds
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def timed(self, name, iterable):
+        # Bill the time spent producing each item of a lazy stream to name.
+        iterator = iter(iterable)
+        while True:
+            self._enter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self._exit(name)
+                return
+            except BaseException:
+                self._exit(name)
+                raise
+            self._exit(name)
+            yield item
+
+    def merge(self, data):
+        for name, seconds in data.get("phases", {}).items():
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+        for name, n in data.get("counters", {}).items():
+            self.count(name, n)
+
+    def as_dict(self):
+        order = {name: i for i, name in enumerate(PHASE_ORDER)}
+        phases = sorted(self.phases.items(), key=lambda item: (order.get(item[0], 99), item[0]))
+        return {
+            "phases": dict(phases),
+            "total_s": sum(self.phases.values()),
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def write(self, path=None):
+        report = self.as_dict()
+        if path:
+            with open(path, "w", encoding="utf-8") as fh:
+                json.dump(report, fh, indent=1)
+            return
+        lines = ["KM Living Hinge profile:"]
+        for name, seconds in report["phases"].items():
+            lines.append(f"  {name:10s} {seconds * 1000:10.1f} ms")
+        lines.append(f"  {'total':10s} {report['total_s'] * 1000:10.1f} ms")
+        for name, n in report["counters"].items():
+            lines.append(f"  {name:22s} {n:12d}")
+        print("\n".join(lines), file=sys.stderr)
+
+
+class _Phase:
+    __slots__ = ("profile", "name")
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.profile._enter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile._exit(self.name)
+        return False
@@ -0,0 +1,101 @@
+# Living Hinge parameter sweeps
+# - Generates one pattern over a grid of option values in a single call,
+#   e.g. a sheet of test coupons for a new material
+# - Outlines are simplified, rotated and indexed once per angle, and every
+#   variant at that angle reuses them
+# - Variants can be laid out side by side on one sheet
+
+import argparse
+import math
+from itertools import product
+
+from livinghinge import Bezier, PreparedOutline
+from livinghinge_job import hinge_arguments, polygons_bbox, profile_phase, run_hinge_job
+
+
+def parse_sweep(specs):
+    # ["bezier_x_spacing=0.5,1,1.5", "angle=0:90:30"] -> {name: [values]}.
+    # A start:stop:step range includes stop when a step lands on it.
+    grid = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        name = name.strip()
+        if not sep or not name or not values.strip():
+            raise ValueError(f"sweep needs name=values, got {spec!r}")
+        parsed = []
+        for part in values.split(","):
+            if ":" in part:
+                start, stop, step = (float(v) for v in part.split(":"))
+                if step <= 0:
+                    raise ValueError(f"sweep step must be positive, got {spec!r}")
+                count = int(math.floor((stop - start) / step + 1e-9)) + 1
+                parsed.extend(start + step * i for i in range(count))
+            else:
+                parsed.append(float(part))
+        grid[name] = parsed
+    return grid
+
+
+def sweep_variants(grid):
+    # Every combination, the last option changing fastest.
+    names = list(grid)
+    return [dict(zip(names, values)) for values in product(*(grid[name] for name in names))]
+
+
+def sheet_layout(count, bbox, gap):
+    # Row-major offsets for count copies of bbox (x, y, width, height), about
+    # as many columns as rows, and the bbox of the whole sheet.
+    x, y, width, height = bbox
+    columns = max(1, math.ceil(math.sqrt(count)))
+    rows = max(1, -(-count // columns))
+    offsets = [
+        ((index % columns) * (width + gap), (index // columns) * (height + gap))
+        for index in range(count)
+    ]
+    sheet = (x, y, columns * (width + gap) - gap, rows * (height + gap) - gap)
+    return offsets, sheet
+
+
+def shift_cells(cells, dx, dy):
+    for strokes in cells:
+        yield [
+            (Bezier if isinstance(stroke, Bezier) else list)((x + dx, y + dy) for x, y in stroke)
+            for stroke in strokes
+        ]
+
+
+def run_sweep(shape_polygons, opts, grid, to_uu, gap=None, profile=None):
+    # grid maps option names (as in add_hinge_arguments, values in opts.units
+    # like the options themselves) to the values to try. Returns
+    # [(overrides, cell streams, report, offset)] in sweep_variants order;
+    # with a gap the variants are shifted into a sheet_layout grid.
+    for name in grid:
+        if not hasattr(opts, name):
+            raise ValueError(f"unknown sweep option {name!r}")
+    bbox = polygons_bbox(shape_polygons)
+    variants = sweep_variants(grid)
+    if gap is None:
+        offsets = [(0.0, 0.0)] * len(variants)
+    else:
+        offsets = sheet_layout(len(variants), bbox, gap)[0]
+
+    outlines = {}
+    runs = []
+    for overrides, (dx, dy) in zip(variants, offsets):
+        variant_opts = argparse.Namespace(**dict(vars(opts), **overrides))
+        angle_rad = math.radians(float(variant_opts.angle))
+        hinge_args = hinge_arguments(variant_opts, bbox, to_uu, angle_rad)
+        key = (angle_rad, hinge_args["simplify"])
+        if key not in outlines:
+            with profile_phase(profile, "prepare"):
+                outlines[key] = [
+                    PreparedOutline(polygons, angle_rad, hinge_args["simplify"])
+                    for polygons in shape_polygons
+                ]
+        results, report = run_hinge_job(
+            shape_polygons, hinge_args, variant_opts, profile, outlines=outlines[key]
+        )
+        if dx or dy:
+            results = [shift_cells(cells, dx, dy) for cells in results]
+        runs.append((overrides, results, report, (dx, dy)))
+    return runs
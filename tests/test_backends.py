@@ -0,0 +1,98 @@
+# The NumPy backend must cut the same hinge as the Python engine. Pieces may
+# be split at different points, so each side's segments only have to lie on
+# the other's to within the tolerance.
+
+import math
+
+import pytest
+
+from livinghinge import generate_hinge
+from shapes import SHAPES, get_config
+
+pytest.importorskip("numpy")
+
+TOLERANCE = 1e-6
+
+
+def _rect(x0, y0, x1, y1):
+    return [(x0, y0), (x1, y0), (x1, y1), (x0, y1), (x0, y0)]
+
+
+def _circle(cx, cy, r, n=64):
+    pts = [
+        (cx + r * math.cos(2 * math.pi * i / n), cy + r * math.sin(2 * math.pi * i / n))
+        for i in range(n)
+    ]
+    return pts + [pts[0]]
+
+
+OUTLINES = {
+    "rectangle": [_rect(0, 0, 40, 25)],
+    "circle": [_circle(20, 20, 18)],
+    "holed": [_rect(0, 0, 40, 30), _rect(10, 8, 25, 20)[::-1]],
+    "concave": [[(0, 0), (40, 0), (40, 30), (25, 30), (20, 10), (15, 30), (0, 30), (0, 0)]],
+}
+
+# At 90 degrees rectangle edges lie exactly on cut lines, and both engines
+# must drop the cuts that run along the outline.
+ANGLES = (0, 30, 75, 90, -45)
+
+
+def _segments(cells):
+    return [(a, b) for cell in cells for stroke in cell for a, b in zip(stroke, stroke[1:])]
+
+
+def _distance(pt, a, b):
+    vx = b[0] - a[0]
+    vy = b[1] - a[1]
+    length2 = vx * vx + vy * vy
+    t = 0.0
+    if length2:
+        t = max(0.0, min(1.0, ((pt[0] - a[0]) * vx + (pt[1] - a[1]) * vy) / length2))
+    return math.dist(pt, (a[0] + vx * t, a[1] + vy * t))
+
+
+def _uncovered(segments, others, cell=2.0):
+    # Segments with a point farther than TOLERANCE from every other segment.
+    grid = {}
+    for a, b in others:
+        for i in range(int(min(a[0], b[0]) // cell) - 1, int(max(a[0], b[0]) // cell) + 2):
+            for j in range(int(min(a[1], b[1]) // cell) - 1, int(max(a[1], b[1]) // cell) + 2):
+                grid.setdefault((i, j), []).append((a, b))
+    missing = []
+    for a, b in segments:
+        for f in (0.0, 0.25, 0.5, 0.75, 1.0):
+            pt = (a[0] + (b[0] - a[0]) * f, a[1] + (b[1] - a[1]) * f)
+            near = grid.get((int(pt[0] // cell), int(pt[1] // cell)), ())
+            if min((_distance(pt, *seg) for seg in near), default=math.inf) > TOLERANCE:
+                missing.append((a, b))
+                break
+    return missing
+
+
+def _bbox(polygons):
+    xs = [p[0] for poly in polygons for p in poly]
+    ys = [p[1] for poly in polygons for p in poly]
+    return (min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys))
+
+
+@pytest.mark.parametrize("angle", ANGLES)
+@pytest.mark.parametrize("outline", sorted(OUTLINES))
+@pytest.mark.parametrize("pattern", sorted(SHAPES))
+def test_numpy_matches_python(pattern, outline, angle):
+    polygons = OUTLINES[outline]
+    if pattern == "line":
+        dimensions = (0.8, 0, 2.0, 2.0)
+    else:
+        dimensions = (8.0, 4.0, 2.0, 2.0)
+    args = get_config(pattern)(*dimensions, _bbox(polygons))
+    cuts = {
+        backend: _segments(generate_hinge(
+            polygons, SHAPES[pattern], *args,
+            angle_rad=math.radians(angle), backend=backend, tolerance=0.05,
+        ))
+        for backend in ("python", "numpy")
+    }
+    assert cuts["python"]
+    assert _uncovered(cuts["python"], cuts["numpy"]) == []
+    assert _uncovered(cuts["numpy"], cuts["python"]) == []
@@ -0,0 +1,39 @@
+# The edge grid must hand a segment every outline edge it crosses, so
+# clipping through it finds the same crossings as the brute-force reference
+# that tests all edges.
+
+import math
+import random
+
+from livinghinge import _EdgeGrid, _edge_intersections, _segment_intersections
+
+
+def _star(cx, cy, outer, inner, points):
+    ring = [
+        (
+            cx + (outer if i % 2 == 0 else inner) * math.cos(math.pi * i / points),
+            cy + (outer if i % 2 == 0 else inner) * math.sin(math.pi * i / points),
+        )
+        for i in range(2 * points)
+    ]
+    return ring + [ring[0]]
+
+
+def test_edge_grid_finds_every_crossing():
+    polygons = [
+        _star(50, 50, 45, 20, 40),
+        _star(50, 50, 12, 6, 9),
+        [(0, 0), (100, 0), (100, 8), (0, 8), (0, 0)],
+    ]
+    grid = _EdgeGrid(polygons)
+    rng = random.Random(4)
+    for _ in range(3000):
+        x0, y0 = rng.uniform(-10, 110), rng.uniform(-10, 110)
+        length = rng.choice((0.5, 5.0, 60.0))
+        angle = rng.uniform(0, 2 * math.pi)
+        if rng.random() < 0.2:
+            angle = rng.choice((0.0, math.pi / 2))
+        x1, y1 = x0 + length * math.cos(angle), y0 + length * math.sin(angle)
+        found = _edge_intersections((x0, y0), (x1, y1), grid.query(x0, y0, x1, y1))
+        expected = _segment_intersections((x0, y0), (x1, y1), polygons)
+        assert sorted(found) == sorted(expected)
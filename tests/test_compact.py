@@ -0,0 +1,50 @@
+# CompactCells gives back exactly the cells it was given, and its counts
+# and size describe the arrays behind them.
+
+import struct
+
+from livinghinge import Bezier, iter_path_data
+from livinghinge_compact import CompactCells
+
+CELLS = [
+    [[(0.0, 0.0), (1.0, 0.0), (1.0, 2.0)], Bezier([(1.0, 2.0), (2.0, 3.0), (3.0, 2.0)])],
+    [],
+    [Bezier([(0.5, 0.5), (1.0, 1.5), (2.0, 1.5), (2.5, 0.5)])],
+    [[(4.0, 4.0), (5.0, 5.0)], [(6.0, 4.0), (7.0, 5.0)]],
+]
+
+
+def test_round_trip():
+    packed = CompactCells.from_cells(CELLS)
+    assert len(packed) == len(CELLS)
+    assert list(packed) == CELLS
+    assert packed[-1] == CELLS[-1]
+    assert all(
+        isinstance(a, Bezier) == isinstance(b, Bezier)
+        for cell, original in zip(packed, CELLS) for a, b in zip(cell, original)
+    )
+
+
+def test_counts_and_size():
+    packed = CompactCells.from_cells(CELLS)
+    assert packed.stroke_count() == 5
+    assert packed.point_count() == 3 + 3 + 4 + 2 + 2
+    assert packed.nbytes() == (
+        packed.point_count() * 16          # x, y doubles
+        + (packed.stroke_count() + 1) * 8  # point_starts
+        + packed.stroke_count()            # kinds
+        + (len(packed) + 1) * 8            # cell_starts
+    )
+    assert len(packed.tobytes()) == struct.calcsize("<4Q") + packed.nbytes()
+
+
+def test_extend_and_bytes_keep_the_cells():
+    packed = CompactCells.from_cells(CELLS[:2])
+    packed.extend(CompactCells.from_cells(CELLS[2:]))
+    assert list(packed) == CELLS
+    assert list(CompactCells.frombytes(packed.tobytes())) == CELLS
+
+
+def test_path_data_matches_the_list_emitter():
+    packed = CompactCells.from_cells(CELLS)
+    assert list(packed.iter_path_data(precision=3)) == list(iter_path_data(CELLS, precision=3))
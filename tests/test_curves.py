@@ -0,0 +1,75 @@
+# Exact curve clipping must keep the same runs of a curve as clipping a
+# finely flattened copy of it, including curves that touch an edge or pass
+# through a vertex of the outline.
+
+import math
+import random
+
+import pytest
+
+from livinghinge import _EdgeGrid, _bezier_point, _clip_curve, _clip_segment, _point_in_poly
+
+STEPS = 2000
+TOLERANCE = 1e-4
+
+SQUARE = [[(0, 0), (10, 0), (10, 10), (0, 10), (0, 0)]]
+DIAMOND = [[(5, 5), (10, 10), (5, 15), (0, 10), (5, 5)]]
+HEXAGON = [[
+    (10 + 8 * math.cos(math.pi * i / 3), 10 + 8 * math.sin(math.pi * i / 3)) for i in range(7)
+]]
+
+
+def _contains(polygons):
+    return lambda pt: any(_point_in_poly(pt[0], pt[1], poly) for poly in polygons)
+
+
+def _flattened_runs(ctrl, polygons):
+    # [start, end] of each unbroken run of kept chords.
+    grid = _EdgeGrid(polygons)
+    pts = [_bezier_point(ctrl, i / STEPS) for i in range(STEPS + 1)]
+    runs = []
+    for a, b in zip(pts, pts[1:]):
+        for p, q in _clip_segment(a, b, grid, _contains(polygons)):
+            if runs and runs[-1][1] == p:
+                runs[-1][1] = q
+            else:
+                runs.append([p, q])
+    return runs
+
+
+def _assert_same_runs(ctrl, polygons):
+    exact = _clip_curve(ctrl, _EdgeGrid(polygons), _contains(polygons))
+    runs = _flattened_runs(ctrl, polygons)
+    assert len(exact) == len(runs)
+    for piece, (start, end) in zip(exact, runs):
+        assert math.dist(piece[0], start) < TOLERANCE
+        assert math.dist(piece[-1], end) < TOLERANCE
+    return exact
+
+
+@pytest.mark.parametrize("ctrl, polygons", [
+    # Tangent to the top edge from inside.
+    ([(2, 0), (5, 20), (8, 0)], SQUARE),
+    # Tangent to the top edge from outside.
+    ([(2, 20), (5, 0), (8, 20)], SQUARE),
+    # Touches the diamond's bottom vertex from below.
+    ([(0, 0), (5, 10), (10, 0)], DIAMOND),
+    # Passes through the diamond's bottom vertex.
+    ([(5, 0), (5, 4), (5, 6), (5, 14)], DIAMOND),
+    # Crosses a corner of the square.
+    ([(-5, -5), (0, 1), (3, 4), (15, 15)], SQUARE),
+    # Runs along the left edge.
+    ([(0, -2), (0, 4), (0, 8), (0, 12)], SQUARE),
+])
+def test_touching_curves_match_flattening(ctrl, polygons):
+    _assert_same_runs(ctrl, polygons)
+
+
+def test_random_curves_match_flattening():
+    rng = random.Random(7)
+    kept = 0
+    for _ in range(40):
+        polygons = rng.choice((SQUARE, DIAMOND, HEXAGON))
+        ctrl = [(rng.uniform(-4, 20), rng.uniform(-4, 20)) for _ in range(rng.choice((3, 4)))]
+        kept += bool(_assert_same_runs(ctrl, polygons))
+    assert kept > 10
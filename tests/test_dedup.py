@@ -0,0 +1,45 @@
+# Duplicate cut removal: repeated and overlapping cuts go, whichever way
+# they run, and everything cut only once is kept as it was.
+
+import pytest
+
+from livinghinge import Bezier
+from livinghinge_dedup import dedupe_cells
+
+
+def test_repeated_segment_is_dropped():
+    cells = [[[(0, 0), (10, 0)]], [[(10, 0), (0, 0)]], [[(0, 5), (10, 5)]]]
+    kept, removed = dedupe_cells(cells)
+    assert kept == [[[(0, 0), (10, 0)]], [[(0, 5), (10, 5)]]]
+    assert removed == pytest.approx(10.0)
+
+
+def test_overlap_is_trimmed_to_the_uncut_part():
+    cells = [[[(0, 0), (10, 10)]], [[(5, 5), (15, 15)]]]
+    kept, removed = dedupe_cells(cells)
+    assert kept[0] == [[(0, 0), (10, 10)]]
+    (start, end), = [tuple(stroke) for stroke in kept[1]]
+    assert start == pytest.approx((10, 10))
+    assert end == (15, 15)
+    assert removed == pytest.approx(50 ** 0.5)
+
+
+def test_cuts_along_an_earlier_one_are_dropped():
+    cells = [[[(0, 0), (20, 0)]], [[(0, 0), (5, 0), (5, 3)], [(8, 0), (12, 0)]]]
+    kept, removed = dedupe_cells(cells)
+    assert kept == [[[(0, 0), (20, 0)]], [[(5, 0), (5, 3)]]]
+    assert removed == pytest.approx(9.0)
+
+
+def test_repeated_curve_is_dropped_in_either_direction():
+    curve = Bezier([(0, 0), (2, 4), (6, 4), (8, 0)])
+    kept, removed = dedupe_cells([[curve], [curve[::-1]]])
+    assert kept == [[curve]]
+    assert removed > 8.0
+
+
+def test_distinct_cuts_are_untouched():
+    cells = [[[(0, 0), (10, 0)]], [[(0, 0.5), (10, 0.5)]], [[(11, 0), (20, 0)]]]
+    kept, removed = dedupe_cells(cells, tolerance=0.01)
+    assert kept == cells
+    assert removed == 0.0
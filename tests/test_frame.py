@@ -0,0 +1,26 @@
+# Frame-space cells point at one shared template, however the sheet is split
+# into tiles, so the emitter writes the cell path once.
+
+import math
+
+import pytest
+
+from livinghinge import TemplateCell, iter_hinge
+from shapes import get_shape
+
+PANEL = [[(0, 0), (200, 0), (200, 120), (0, 120), (0, 0)]]
+
+
+@pytest.mark.parametrize("backend", ("python", "numpy"))
+def test_tiles_share_one_template(backend):
+    if backend == "numpy":
+        pytest.importorskip("numpy")
+    cells = [
+        cell for cell in iter_hinge(
+            PANEL, get_shape("fishbone"), 10, 5, 2, 2, 6, angle_rad=math.radians(20),
+            backend=backend, frame_space=True, tile_size=40,
+        )
+        if isinstance(cell, TemplateCell)
+    ]
+    assert len(cells) > 20
+    assert len({id(cell.template) for cell in cells}) == 1
@@ -0,0 +1,32 @@
+# The slab index answers containment like the plain ray test over every
+# polygon, one point at a time or in a batch.
+
+import math
+import random
+
+from livinghinge import _point_in_poly, _Slabs
+
+
+def _ring(cx, cy, radii):
+    step = 2 * math.pi / len(radii)
+    pts = [(cx + r * math.cos(i * step), cy + r * math.sin(i * step)) for i, r in enumerate(radii)]
+    return pts + [pts[0]]
+
+
+def test_contains_many_matches_ray_test():
+    rng = random.Random(7)
+    polygons = [
+        _ring(50, 50, [rng.uniform(20, 45) for _ in range(60)]),
+        _ring(50, 50, [8] * 12),
+        _ring(80, 30, [rng.uniform(5, 25) for _ in range(25)]),
+        [(0, 0), (30, 0), (30, 10), (20, 10), (20, 5), (10, 5), (10, 10), (0, 10), (0, 0)],
+    ]
+    slabs = _Slabs(polygons)
+    assert slabs.ok
+
+    points = [(rng.uniform(-5, 105), rng.uniform(-5, 105)) for _ in range(5000)]
+    # Points level with a vertex sit on a slab boundary.
+    points += [(rng.uniform(-5, 105), y) for poly in polygons for _, y in poly]
+    expected = [any(_point_in_poly(x, y, poly) for poly in polygons) for x, y in points]
+    assert slabs.contains_many(points) == expected
+    assert [slabs.contains(x, y) for x, y in points] == expected